@@ -1,507 +1,2021 @@
-from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
-import requests
-from collections import Counter
-import datetime
-import uvicorn
-import itertools
-import json
-
-app = FastAPI()
-
-# --- 1. 核心量化分析邏輯 (穩定維持 100 期回測視野) ---
-
-def get_data_and_analyze(target_date=None, mode_exclusive=True):
-    now = datetime.datetime.now()
-    if not target_date: target_date = now.strftime("%Y-%m-%d")
-    yesterday = (now - datetime.timedelta(days=1)).strftime("%Y-%m-%d")
-    headers = {'User-Agent': 'Mozilla/5.0', 'Referer': 'https://winwin.tw/Bingo'}
-
-    def fetch_api(date_str):
-        url = f"https://winwin.tw/Bingo/GetBingoData?date={date_str}"
-        try:
-            resp = requests.get(url, headers=headers, timeout=10)
-            return resp.json() if resp.status_code == 200 else []
-        except: return []
-
-    data_today = fetch_api(target_date)
-    data_yesterday = fetch_api(yesterday)
-    full_raw_data = data_today + data_yesterday 
-
-    if not full_raw_data:
-        return [], [], [], "0:0", "0:0", "0:0", "0:0", {}, [], "N/A", "--:--", target_date, []
-
-    all_draws = []
-    recent_history = [] 
-    for item in full_raw_data:
-        draw_str = item.get('BigShowOrder', '')
-        if draw_str:
-            nums = [int(n) for n in draw_str.split(',') if n.strip().isdigit()]
-            if len(nums) == 20: 
-                all_draws.append(nums)
-                if len(recent_history) < 100:
-                    raw_date = item.get('OpenDate', '')
-                    d_time = raw_date[11:16] if 'T' in raw_date else '--:--'
-                    recent_history.append({"no": item.get('No'), "time": d_time, "nums": nums})
-    
-    latest_no = full_raw_data[0].get('No', 'N/A')
-    raw_latest_date = full_raw_data[0].get('OpenDate', '')
-    latest_time = raw_latest_date[11:16] if 'T' in raw_latest_date else '--:--'
-    latest_win_nums = all_draws[0] if all_draws else []
-    
-    co_occ = Counter()
-    for d in all_draws[:200]: 
-        for pair in itertools.combinations(sorted(d), 2): co_occ[pair] += 1
-    
-    recent_20 = all_draws[:20]
-    o_20 = len([n for d in recent_20 for n in d if n % 2 != 0]); e_20 = 400 - o_20
-    s_20 = len([n for d in recent_20 for n in d if n <= 40]); b_20 = 400 - s_20
-    status = {'odd': o_20 <= 160, 'even': e_20 <= 160, 'small': s_20 <= 160, 'big': b_20 <= 160}
-
-    long_freq = Counter([n for d in all_draws[:50] for n in d])
-    short_heat = Counter([n for d in all_draws[:15] for n in d])
-    
-    all_analysis = []
-    for i in range(1, 81):
-        streak = 0
-        for d in all_draws:
-            if i in d: streak += 1
-            else: break
-        l_penalty = -15.0 if streak >= 3 else 0.0
-        cur_wp = 1.2 if (i%2!=0 and status['odd']) or (i%2==0 and status['even']) else 1.0
-        cur_ws = 1.2 if (i<=40 and status['small']) or (i>40 and status['big']) else 1.0
-        final_score = (long_freq[i] + (5.0 if streak==1 else 2.0 if streak==2 else 0) + l_penalty) * cur_wp * cur_ws - (short_heat[i]*2.0)
-        all_analysis.append({'no': i, 'score': round(final_score, 1)})
-
-    def get_synergy(n1, n2): return co_occ.get(tuple(sorted((n1, n2))), 0)
-
-    def generate_squads_smart(pool, size, count, exclusive, cat_used):
-        squads = []
-        fingerprints = []
-        sorted_seeds = sorted(pool, key=lambda x: x['score'], reverse=True)[:count]
-        for i, seed in enumerate(sorted_seeds):
-            seed_no = seed['no']
-            avoid = cat_used if exclusive else {seed_no}
-            all_partners = sorted([p for p in pool if p['no'] not in avoid and p['no'] != seed_no], 
-                                  key=lambda x: (get_synergy(seed_no, x['no']), x['score']), reverse=True)
-            p_idx = size - 1
-            cur_squad = sorted([seed_no] + [p['no'] for p in all_partners[:p_idx]])
-            while cur_squad in fingerprints and p_idx < len(all_partners):
-                cur_squad = sorted([seed_no] + [p['no'] for p in all_partners[:p_idx-1]] + [all_partners[p_idx]['no']])
-                p_idx += 1
-            fingerprints.append(cur_squad)
-            if exclusive:
-                for n in cur_squad: cat_used.add(n)
-            squads.append({"id": i+1, "picks": cur_squad})
-        return squads
-
-    u3 = set(); u4 = set(); u6 = set()
-    res_3star = generate_squads_smart(all_analysis, 3, 10, mode_exclusive, u3)
-    res_4star = generate_squads_smart(all_analysis, 4, 10, mode_exclusive, u4)
-    res_6star = generate_squads_smart(all_analysis, 6, 10, mode_exclusive, u6)
-
-    today_draws = [[int(x) for x in item.get('BigShowOrder','').split(',') if x.strip().isdigit()] for item in data_today if item.get('BigShowOrder','')]
-    today_balls = [n for d in today_draws if len(d)==20 for n in d]
-    p_day = f"{len([n for n in today_balls if n%2!=0])}:{len(today_balls)-len([n for n in today_balls if n%2!=0])}"
-    s_day = f"{len([n for n in today_balls if n<=40])}:{len(today_balls)-len([n for n in today_balls if n<=40])}"
-
-    return (res_3star, res_4star, res_6star, p_day, s_day, f"{o_20}:{e_20}", f"{s_20}:{b_20}", status, latest_win_nums, latest_no, latest_time, target_date, recent_history)
-
-# --- 2. 網頁前端 ---
-
-@app.get("/", response_class=HTMLResponse)
-async def index(request: Request, date: str = None, exclusive: bool = True):
-    (res_3star, res_4star, res_6star, p_day, s_day, p_20, s_20, status, latest_win, latest_no, latest_time, active_date, recent_history) = get_data_and_analyze(date, exclusive)
-    
-    html_content = """
-    <html class="dark">
-    <head>
-        <title>賓果量化 VIP</title>
-        <meta name="viewport" content="width=device-width, initial-scale=1, maximum-scale=1, user-scalable=0">
-        <script src="https://cdn.tailwindcss.com"></script>
-        <script>tailwind.config = { darkMode: 'class' }</script>
-        <style>
-            @import url('https://fonts.googleapis.com/css2?family=Noto+Sans+TC:wght@400;700;900&display=swap');
-            body { font-family: 'Noto Sans TC', sans-serif; transition: background-color 0.3s; -webkit-tap-highlight-color: transparent; }
-            .latest-ball { background: #f1f5f9; color: #475569; font-weight: 900; width: 34px; height: 34px; display: flex; align-items: center; justify-content: center; border-radius: 50%; font-size: 11px; border: 1px solid #e2e8f0; }
-            .dark .latest-ball { background: #1e293b; color: #94a3b8; border-color: #334155; }
-            .ball-hit { background-color: #fbbf24 !important; color: #000 !important; font-weight: 900; transform: scale(1.05); box-shadow: 0 0 10px rgba(251, 191, 36, 0.4); border: none !important; }
-
-            .badge-graphical { padding: 3px 8px; border-radius: 6px; font-size: 9px; font-weight: 900; display: inline-flex; align-items: center; justify-content: center; margin: 2px; }
-            .badge-3s { background: linear-gradient(135deg, #f59e0b 0%, #d97706 100%); color: white; }
-            .badge-4s { background: linear-gradient(135deg, #6366f1 0%, #4338ca 100%); color: white; }
-            .badge-6s { background: linear-gradient(135deg, #be123c 0%, #9f1239 100%); color: white; }
-            .badge-jackpot { background: linear-gradient(135deg, #fbbf24 0%, #f59e0b 100%); color: black !important; border: 1px solid #fff; animation: pulse-gold 1.5s infinite; }
-            
-            .matrix-jackpot { border: 2.5px solid #fbbf24 !important; box-shadow: 0 0 25px rgba(251, 191, 36, 0.6); animation: jackpot-blink 1s infinite alternate; background: rgba(251, 191, 36, 0.1) !important; }
-
-            @keyframes pulse-gold { 0% { transform: scale(1); } 50% { transform: scale(1.05); } 100% { transform: scale(1); } }
-            @keyframes jackpot-blink { from { border-color: #fbbf24; } to { border-color: #fff; transform: scale(1.02); } }
-
-            .streak-start-3s { border: 3px solid #a855f7 !important; position: relative; background: rgba(168, 85, 247, 0.05) !important; }
-            .streak-start-3s::after { content: '未命中起點'; position: absolute; top: -10px; right: 10px; background: #a855f7; color: white; font-size: 8px; padding: 1px 6px; border-radius: 4px; font-weight: 900; }
-
-            .dist-grid { display: grid; grid-template-columns: repeat(10, 1fr); gap: 3px; background: #fefce8; padding: 10px; border-radius: 16px; }
-            .dark .dist-grid { background: #0f172a; border: 1px solid #1e293b; }
-            .dist-ball { background: #ffffff; color: #64748b; font-weight: 900; font-size: 9px; height: 22px; display: flex; align-items: center; justify-content: center; border-radius: 6px; border: 1px solid #e2e8f0; }
-            .dark .dist-ball { background: #1e293b; color: #475569; border-color: #0f172a; }
-            
-            .active-3s { background: #f59e0b !important; color: white !important; border: none !important; }
-            .active-4s { background: #6366f1 !important; color: white !important; border: none !important; }
-            .active-6s { background: #be123c !important; color: white !important; border: none !important; }
-
-            .bt-miss-normal { background: #1e293b; color: #94a3b8; border: 1px solid #334155; }
-            .bt-miss-alert { background: #be123c; color: white; animation: pulse-red 1s infinite alternate; }
-            @keyframes pulse-red { from { opacity: 0.8; } to { opacity: 1; } }
-
-            .alert-jackpot-glow { animation: jackpot-blink 1s infinite alternate; border: 2px solid #fbbf24 !important; }
-
-            .profit-input { background: #f8fafc; border: 1px solid #e2e8f0; color: #1e293b; text-align: center; border-radius: 8px; font-weight: 900; width: 100%; height: 32px; font-size: 14px; }
-            .dark .profit-input { background: #0f172a; border-color: #334155; color: #f1f5f9; }
-        </style>
-    </head>
-    <body class="bg-slate-50 dark:bg-slate-950 text-slate-900 dark:text-slate-200 pb-20 text-[12px]">
-        <div class="max-w-6xl mx-auto p-4 md:p-8">
-            
-            <div class="flex justify-between items-center mb-8">
-                <h1 class="text-xl font-black italic uppercase dark:text-white tracking-tighter">賓果量化 <span class="text-rose-600 font-black">VIP</span></h1>
-                <button onclick="toggleDarkMode()" id="theme-btn" class="bg-slate-800 text-amber-400 px-4 py-2 rounded-xl font-black text-[10px] shadow-lg">🌙 主題切換</button>
-            </div>
-
-            <div class="grid grid-cols-1 md:grid-cols-2 gap-4 mb-8 text-white text-center italic font-black">
-                <div class="bg-indigo-700 p-6 rounded-[2rem] shadow-xl border-2 border-indigo-400">
-                    <p class="text-[10px] uppercase mb-4 tracking-widest underline underline-offset-4">奇偶動能分析</p>
-                    <div class="grid grid-cols-2 gap-4 border-t border-white/10 pt-4"><div><p class="text-[8px] opacity-60">今日累計</p><p class="text-lg">{{ p_day }}</p></div><div class="border-l border-white/10"><p class="text-[8px] text-amber-300 underline underline-offset-2">最近 20 期</p><p class="text-xl font-black text-amber-300">{{ p_20 }}</p></div></div>
-                </div>
-                <div class="bg-emerald-700 p-6 rounded-[2rem] shadow-xl border-2 border-emerald-400">
-                    <p class="text-[10px] uppercase mb-4 tracking-widest underline underline-offset-4">大小動能分析</p>
-                    <div class="grid grid-cols-2 gap-4 border-t border-white/10 pt-4"><div><p class="text-[8px] opacity-60">今日累計</p><p class="text-lg">{{ s_day }}</p></div><div class="border-l border-white/10"><p class="text-[8px] text-amber-300 underline underline-offset-2">最近 20 期</p><p class="text-xl font-black text-amber-300">{{ s_20 }}</p></div></div>
-                </div>
-            </div>
-
-            <div class="grid grid-cols-1 lg:grid-cols-4 gap-6 mb-10 text-center font-black">
-                <div class="lg:col-span-3 bg-white dark:bg-slate-900 p-6 rounded-3xl shadow-sm border border-slate-100 dark:border-slate-800 italic">
-                    <div class="flex justify-between items-center mb-6 border-b pb-4 text-slate-400 font-black">
-                        <h3 class="text-xs uppercase tracking-widest">📢 最新期號: <span class="text-indigo-600 dark:text-indigo-400 font-mono">{{ latest_no }} ({{ latest_time }})</span></h3>
-                        <button onclick="location.reload()" class="bg-indigo-500 text-white px-5 py-2 rounded-xl text-[10px] shadow-lg">刷新數據</button>
-                    </div>
-                    <div class="space-y-6 text-center">
-                        <div class="bg-rose-50 dark:bg-rose-950/20 p-5 rounded-[2.5rem] border-2 border-rose-100 dark:border-rose-900/30">
-                            <p class="text-[10px] font-black text-rose-500 mb-4 uppercase tracking-[0.4em] underline underline-offset-8 italic">🔥 VIP 核心狙擊</p>
-                            <div class="flex justify-center items-center gap-3">
-                                {% for n in res_6star[0].picks %}<div class="latest-ball" style="background:#be123c; color:white; border:none; width:36px; height:36px;">{{ "%02d" | format(n) }}</div>{% endfor %}
-                                <button onclick='quickFill("6s", 1, {{ res_6star[0].picks | tojson }})' class="ml-4 bg-rose-600 text-white px-6 py-2.5 rounded-2xl text-[10px] font-black shadow-xl">裝載 V1</button>
-                            </div>
-                        </div>
-                        <div class="flex flex-wrap gap-2.5 justify-center">{% for n in latest_win %}<div class="latest-ball ball-all" data-val="{{ n }}">{{ "%02d" | format(n) }}</div>{% endfor %}</div>
-                    </div>
-                </div>
-                <div class="bg-slate-900 p-5 rounded-3xl shadow-xl border-4 border-slate-800 text-white font-black italic">
-                    <h4 class="text-center text-[9px] font-black text-indigo-400 uppercase mb-4 underline underline-offset-4">即時中獎監控</h4>
-                    <div class="space-y-3">
-                        <div id="card-3s" class="bg-slate-800/50 p-2 rounded-2xl border border-slate-700 transition-all"><p class="text-[7px] text-amber-500 mb-1.5 uppercase font-black">3-Star (未命中: <span id="bt-count-3s-live">0</span>)</p><div class="grid grid-cols-2 gap-2 text-center"><div class="stat-card"><p class="text-[5px] text-slate-400">中2</p><p class="text-lg" id="count-3s-2">0</p></div><div class="stat-card"><p class="text-[5px] text-slate-400">全中</p><p class="text-lg text-amber-400" id="count-3s-3">0</p></div></div></div>
-                        <div id="card-4s" class="bg-slate-800/50 p-2 rounded-2xl border border-slate-700 transition-all"><p class="text-[7px] text-indigo-400 mb-1.5 uppercase font-black">4-Star (未命中: <span id="bt-count-4s-live">0</span>)</p><div class="grid grid-cols-3 gap-1 text-center"><div class="stat-card"><p class="text-[5px] text-slate-400">中2</p><p class="text-md" id="count-4s-2">0</p></div><div class="stat-card"><p class="text-[5px] text-slate-400">中3</p><p class="text-md" id="count-4s-3">0</p></div><div class="stat-card"><p class="text-[5px] text-slate-400">全中</p><p class="text-md text-indigo-400" id="count-4s-4">0</p></div></div></div>
-                        <div id="card-6s" class="bg-slate-800/50 p-2 rounded-2xl border border-slate-700 transition-all"><p class="text-[7px] text-rose-500 mb-1.5 uppercase font-black">VIP 6-Star (未命中: <span id="bt-count-6s-live">0</span>)</p><div class="grid grid-cols-4 gap-0.5 text-center font-black"><div class="stat-card"><p class="text-[4px] text-slate-400">中3</p><p class="text-[10px]" id="count-6s-3">0</p></div><div class="stat-card"><p class="text-[4px] text-slate-400">中4</p><p class="text-[10px]" id="count-6s-4">0</p></div><div class="stat-card"><p class="text-[4px] text-slate-400">中5</p><p class="text-[10px]" id="count-6s-5">0</p></div><div class="stat-card"><p class="text-[4px] text-slate-400">全中</p><p class="text-[10px] text-rose-400" id="count-6s-6">0</p></div></div></div>
-                    </div>
-                </div>
-            </div>
-
-            <div class="bg-white dark:bg-slate-900 p-6 rounded-[3rem] shadow-xl border border-slate-200 dark:border-slate-800 mb-6 italic">
-                <div class="grid grid-cols-1 md:grid-cols-4 gap-4 font-black">
-                    <div class="space-y-2 text-center border-r dark:border-slate-800 pr-4">
-                        <label class="text-[8px] text-slate-400 uppercase">倍數 / 組數</label>
-                        <div class="flex gap-2"><input type="number" id="in-multiplier" class="profit-input" value="1" oninput="calculateProfit()"><input type="number" id="in-sets" class="profit-input" value="10" oninput="calculateProfit()"></div>
-                        <button onclick="postToDailyJournal()" class="w-full mt-2 bg-emerald-600 text-white py-2 rounded-xl text-[10px] font-black uppercase">存入日誌</button>
-                    </div>
-                    <div class="space-y-2 px-2 text-center border-r dark:border-slate-800">
-                        <p class="text-[9px] text-amber-500 uppercase border-b">三星命中</p>
-                        <div class="grid grid-cols-2 gap-2 mt-2"><input type="number" id="in-3h2" class="profit-input" placeholder="中2" oninput="calculateProfit()"><input type="number" id="in-3h3" class="profit-input" placeholder="全中" oninput="calculateProfit()"></div>
-                    </div>
-                    <div class="space-y-2 px-2 text-center border-r dark:border-slate-800">
-                        <p class="text-[9px] text-indigo-500 uppercase border-b">四星命中</p>
-                        <div class="grid grid-cols-3 gap-1 mt-2"><input type="number" id="in-4h2" class="profit-input" placeholder="2" oninput="calculateProfit()"><input type="number" id="in-4h3" class="profit-input" placeholder="3" oninput="calculateProfit()"><input type="number" id="in-4h4" class="profit-input" placeholder="全" oninput="calculateProfit()"></div>
-                    </div>
-                    <div class="space-y-2 px-2 text-center">
-                        <p class="text-[9px] text-rose-500 uppercase border-b">六星命中</p>
-                        <div class="grid grid-cols-2 gap-1 mt-2"><input type="number" id="in-6h4" class="profit-input" placeholder="中4" oninput="calculateProfit()"><input type="number" id="in-6h6" class="profit-input" placeholder="全中" oninput="calculateProfit()"></div>
-                    </div>
-                </div>
-                <div class="grid grid-cols-3 gap-4 mt-6 text-center bg-slate-50 dark:bg-slate-950 p-4 rounded-2xl border dark:border-slate-800 font-black">
-                    <div><p class="text-[8px] text-slate-400 uppercase">成本</p><p class="text-lg text-rose-500" id="display-total-cost">-$ 0</p></div>
-                    <div><p class="text-[8px] text-slate-400 uppercase">獎金</p><p class="text-lg text-indigo-400" id="display-total-prize">+$ 0</p></div>
-                    <div class="border-l dark:border-slate-800"><p class="text-[8px] text-indigo-600 uppercase">預估淨利</p><p class="text-lg text-emerald-400" id="display-net-profit">$ 0</p></div>
-                </div>
-            </div>
-
-            <div class="bg-emerald-900 p-8 rounded-[3rem] shadow-2xl text-white mb-6 border-4 border-emerald-800 italic">
-                <div class="flex justify-between items-center mb-6">
-                    <h3 class="text-[11px] font-black uppercase tracking-[0.3em]">今日實戰累積日誌</h3>
-                    <button onclick="resetDailyJournal()" class="text-[8px] bg-red-900 px-4 py-1.5 rounded-full uppercase">清空日誌</button>
-                </div>
-                <div class="grid grid-cols-1 md:grid-cols-3 gap-6 text-center font-black">
-                    <div class="bg-black/20 p-5 rounded-3xl border border-white/5"><p class="text-[9px] text-emerald-300 mb-1">今日成本</p><p class="text-2xl font-mono" id="day-total-cost">$ 0</p></div>
-                    <div class="bg-black/20 p-5 rounded-3xl border border-white/5"><p class="text-[9px] text-emerald-300 mb-1">今日獎金</p><p class="text-2xl font-mono" id="day-total-prize">$ 0</p></div>
-                    <div class="bg-emerald-500 text-emerald-950 p-5 rounded-3xl shadow-lg border-2 border-emerald-400 font-black"><p class="text-[9px] uppercase mb-1">今日純利</p><p class="text-3xl font-mono" id="day-net-profit">$ 0</p></div>
-                </div>
-            </div>
-
-            <div class="grid grid-cols-1 md:grid-cols-3 gap-4 mb-6 text-center italic font-black uppercase">
-                <div class="bg-white dark:bg-slate-900 p-4 rounded-3xl border dark:border-slate-800"><h3 class="text-[8px] text-amber-600 mb-3 underline">📡 三星分佈</h3><div class="dist-grid" id="dist-grid-3s">{% for i in range(1, 81) %}<div class="dist-ball" id="dist3s-{{i}}">{{ "%02d" | format(i) }}</div>{% endfor %}</div></div>
-                <div class="bg-white dark:bg-slate-900 p-4 rounded-3xl border dark:border-slate-800"><h3 class="text-[8px] text-indigo-600 mb-3 underline">📡 四星分佈</h3><div class="dist-grid" id="dist-grid-4s">{% for i in range(1, 81) %}<div class="dist-ball" id="dist4s-{{i}}">{{ "%02d" | format(i) }}</div>{% endfor %}</div></div>
-                <div class="bg-white dark:bg-slate-900 p-4 rounded-3xl border dark:border-slate-800"><h3 class="text-[8px] text-rose-600 mb-3 underline">📡 六星狙擊</h3><div class="dist-grid" id="dist-grid-6s">{% for i in range(1, 81) %}<div class="dist-ball" id="dist6s-{{i}}">{{ "%02d" | format(i) }}</div>{% endfor %}</div></div>
-            </div>
-
-            <div class="space-y-6 mb-10">
-                <div class="bg-slate-900 p-6 rounded-[3rem] shadow-2xl border-4 border-slate-800 text-white font-black">
-                    <div class="flex justify-between items-center mb-4 px-2 text-amber-400"><h3 class="text-[10px]">三星矩陣庫</h3><div class="flex gap-2"><button onclick="loadAll('3s')" class="bg-green-700 px-3 py-1 rounded text-[8px]">裝載</button><button onclick="clearMatrix('3s')" class="bg-red-900 px-3 py-1 rounded text-[8px]">清除</button></div></div>
-                    <div class="grid grid-cols-2 md:grid-cols-5 gap-3">
-                        {% for i in range(1, 11) %}
-                        <div id="set-3s-{{i}}" class="bg-slate-800/50 p-2 rounded-xl text-center border border-transparent">
-                            <div class="flex justify-between items-center mb-1 px-1">
-                                <span class="text-[7px] text-slate-500 uppercase">SET {{ i }}</span>
-                                <span class="text-[7px] bg-black/40 px-1.5 py-0.5 rounded-full text-slate-400 font-black" id="jack-stat-3s-{{i}}">🏆 100期: 0</span>
-                            </div>
-                            <div class="flex gap-1">{% for j in range(1, 4) %}<input type="text" id="3s-g{{i}}n{{j}}" class="w-full h-8 text-center text-sm font-black bg-slate-900 rounded border border-slate-600 text-white" oninput="saveAndCompare()">{% endfor %}</div>
-                        </div>
-                        {% endfor %}
-                    </div>
-                </div>
-                <div class="bg-slate-900 p-6 rounded-[3rem] shadow-2xl border-4 border-slate-800 text-white font-black">
-                    <div class="flex justify-between items-center mb-4 px-2 text-indigo-400"><h3 class="text-[10px]">四星矩陣庫</h3><div class="flex gap-2"><button onclick="loadAll('4s')" class="bg-indigo-700 px-3 py-1 rounded text-[8px]">裝載</button><button onclick="clearMatrix('4s')" class="bg-red-900 px-3 py-1 rounded text-[8px]">清除</button></div></div>
-                    <div class="grid grid-cols-2 md:grid-cols-5 gap-3">
-                        {% for i in range(1, 11) %}
-                        <div id="set-4s-{{i}}" class="bg-slate-800/50 p-2 rounded-xl text-center border border-transparent">
-                            <div class="flex justify-between items-center mb-1 px-1">
-                                <span class="text-[7px] text-indigo-300 uppercase">S{{ i }}</span>
-                                <span class="text-[7px] bg-black/40 px-1.5 py-0.5 rounded-full text-slate-400 font-black" id="jack-stat-4s-{{i}}">🏆 100期: 0</span>
-                            </div>
-                            <div class="flex gap-1">{% for j in range(1, 5) %}<input type="text" id="4s-g{{i}}n{{j}}" class="w-full h-8 text-center text-xs font-black bg-slate-900 rounded border border-slate-600 text-white" oninput="saveAndCompare()">{% endfor %}</div>
-                        </div>
-                        {% endfor %}
-                    </div>
-                </div>
-                
-                <div class="bg-slate-900 p-8 rounded-[3rem] shadow-2xl border-4 border-slate-800 text-white">
-                    <div class="flex justify-between items-center mb-6 px-2 text-rose-400 uppercase underline underline-offset-8 tracking-widest font-black"><h3 class="text-[10px]">VIP 六星狙擊中心 (10 組)</h3><div class="flex gap-2"><button onclick="loadAll('6s')" class="bg-rose-700 px-4 py-1 rounded text-[8px]">裝載 VIP</button><button onclick="clearMatrix('6s')" class="bg-red-900 px-4 py-1 rounded text-[8px]">清除</button></div></div>
-                    <div class="grid grid-cols-1 md:grid-cols-5 gap-4 font-black">
-                        {% for i in range(1, 11) %}
-                        <div id="set-6s-{{i}}" class="bg-slate-800/50 p-3 rounded-2xl text-center border border-transparent relative overflow-hidden transition-all shadow-inner">
-                            <div class="flex justify-between items-center mb-2 px-1">
-                                <span class="text-[7px] text-rose-400">VIP {{ i }}</span>
-                                <span class="text-[7px] bg-black/40 px-1.5 py-0.5 rounded-full text-slate-400 font-black" id="jack-stat-6s-{{i}}">🏆 100期: 0</span>
-                            </div>
-                            <div class="grid grid-cols-3 gap-1">{% for j in range(1, 7) %}<input type="text" id="6s-g{{i}}n{{j}}" class="w-full h-8 text-center text-[11px] font-black bg-slate-950 rounded border border-slate-700 text-rose-500 outline-none" oninput="saveAndCompare()">{% endfor %}</div>
-                        </div>
-                        {% endfor %}
-                    </div>
-                </div>
-            </div>
-
-            <div class="mb-20">
-                <div class="flex flex-col md:flex-row justify-between items-center mb-6 px-2 border-b dark:border-slate-800 pb-4 font-black uppercase italic gap-4">
-                    <h2 class="text-sm dark:text-white border-l-4 border-indigo-500 pl-3">🚀 量化策略庫房</h2>
-                    <div class="flex items-center gap-3">
-                        <span class="text-[10px] font-black text-slate-500">佈陣邏輯：</span>
-                        <div class="inline-flex rounded-xl bg-slate-100 dark:bg-slate-800 p-1 shadow-inner border dark:border-slate-700">
-                            <button onclick="setExclusive(false)" class="px-4 py-1.5 rounded-lg text-[10px] font-black transition-all {% if not exclusive %}bg-white dark:bg-slate-600 text-indigo-600 dark:text-white shadow-sm{% else %}text-slate-400 opacity-60{% endif %}">精準集中模式</button>
-                            <button onclick="setExclusive(true)" class="px-4 py-1.5 rounded-lg text-[10px] font-black transition-all {% if exclusive %}bg-indigo-600 text-white shadow-md{% else %}text-slate-400 opacity-60{% endif %}">全域覆蓋策略</button>
-                        </div>
-                    </div>
-                </div>
-
-                <div class="grid grid-cols-2 md:grid-cols-5 gap-4 mb-10 text-[10px] uppercase font-black text-center">
-                    {% for sq in res_3star %}<div class="bg-white dark:bg-slate-900 p-3 rounded-2xl shadow-sm border dark:border-slate-800">G{{ sq.id }} (3S)<div class="flex justify-center gap-1 my-2">{% for n in sq.picks %}<span class="bg-slate-900 text-white px-1.5 rounded">{{ "%02d" | format(n) }}</span>{% endfor %}</div><button onclick='quickFill("3s", {{ sq.id }}, {{ sq.picks | tojson }})' class="w-full bg-amber-50 dark:bg-amber-900/20 text-amber-600 py-1 rounded font-black italic shadow-sm uppercase">裝載</button></div>{% endfor %}
-                    {% for sq in res_4star %}<div class="bg-white dark:bg-slate-900 p-3 rounded-2xl shadow-sm border dark:border-slate-800">S{{ sq.id }} (4S)<div class="flex justify-center gap-1 my-2">{% for n in sq.picks %}<span class="bg-indigo-900 text-white px-1.5 rounded">{{ "%02d" | format(n) }}</span>{% endfor %}</div><button onclick='quickFill("4s", {{ sq.id }}, {{ sq.picks | tojson }})' class="w-full bg-indigo-50 dark:bg-indigo-900/20 text-indigo-600 py-1 rounded font-black italic shadow-sm uppercase">裝載</button></div>{% endfor %}
-                    {% for sq in res_6star %}<div class="bg-white dark:bg-slate-900 p-3 rounded-2xl shadow-sm border dark:border-slate-800">V{{ sq.id }} (6S)<div class="flex justify-center gap-0.5 my-2">{% for n in sq.picks %}<span class="bg-rose-900 text-white px-1 rounded text-[8px]">{{ "%02d" | format(n) }}</span>{% endfor %}</div><button onclick='quickFill("6s", {{ sq.id }}, {{ sq.picks | tojson }})' class="w-full bg-rose-50 dark:bg-rose-900/20 text-rose-600 py-1 rounded font-black italic shadow-sm uppercase">裝載</button></div>{% endfor %}
-                </div>
-
-                <div class="bg-white dark:bg-slate-900 p-8 rounded-[3.5rem] shadow-xl border border-slate-200 dark:border-slate-800 text-[10px] font-black italic">
-                    <div class="flex flex-col md:flex-row justify-between items-center mb-6 border-b dark:border-slate-800 pb-4 gap-4 uppercase font-black">
-                        <h3 class="text-sm text-slate-800 dark:text-slate-200 underline underline-offset-8">🕰️ 歷史 100 期實戰戰果分析</h3>
-                        <div class="flex gap-3 font-black">
-                            <div id="bt-box-3s" class="bt-miss-normal px-4 py-1.5 rounded-xl text-[9px]">三星未中: <span id="bt-count-3s">0</span></div>
-                            <div id="bt-box-4s" class="bt-miss-normal px-4 py-1.5 rounded-xl text-[9px]">四星未中: <span id="bt-count-4s">0</span></div>
-                            <div id="bt-box-6s" class="bt-miss-normal px-4 py-1.5 rounded-xl text-[9px]">六星未中: <span id="bt-count-6s">0</span></div>
-                        </div>
-                    </div>
-                    <div id="backtest-body" class="space-y-4 font-mono uppercase italic font-black"></div>
-                </div>
-            </div>
-        </div>
-
-        <script>
-            const server3S = {{ res_3star | tojson }}; const server4S = {{ res_4star | tojson }};
-            const server6S = {{ res_6star | tojson }};
-            const recentHistory = {{ recent_history | tojson }}; const winNums = {{ latest_win | tojson }};
-
-            function toggleDarkMode() { const isDark = document.documentElement.classList.toggle('dark'); localStorage.setItem('bingo_v121_dark', isDark); updateThemeUI(isDark); }
-            function updateThemeUI(isDark) { document.getElementById('theme-btn').innerText = isDark ? '☀️ 亮色模式' : '🌙 深色切換'; }
-            function setExclusive(val) { window.location.href = `/?exclusive=${val}`; }
-
-            function clearMatrix(t) { const sz = (t === '3s') ? 3 : (t === '4s' ? 4 : 6); for(let i=1; i<=10; i++) { for(let j=1; j<=sz; j++) { const el = document.getElementById(`${t}-g${i}n${j}`); if(el) el.value = ""; } } saveAndCompare(); }
-            function loadAll(t) { const pool = (t==='3s'?server3S:(t==='4s'?server4S:server6S)); pool.forEach(sq => { sq.picks.forEach((n, idx) => { const el = document.getElementById(`${t}-g${sq.id}n${idx+1}`); if(el) el.value = n.toString().padStart(2, '0'); }); }); saveAndCompare(); }
-            function quickFill(t, id, ns) { ns.forEach((n, j) => { const el = document.getElementById(`${t}-g${id}n${j+1}`); if(el) el.value = n.toString().padStart(2, '0'); }); saveAndCompare(); }
-
-            function calculateProfit() {
-                const multi = parseInt(document.getElementById('in-multiplier').value) || 1;
-                const sets = parseInt(document.getElementById('in-sets').value) || 10;
-                const cost = sets * multi * 25;
-                const prize = ((parseInt(document.getElementById('in-3h2').value)||0)*50 + (parseInt(document.getElementById('in-3h3').value)||0)*1000 + (parseInt(document.getElementById('in-4h2').value)||0)*25 + (parseInt(document.getElementById('in-4h3').value)||0)*150 + (parseInt(document.getElementById('in-4h4').value)||0)*2000 + (parseInt(document.getElementById('in-6h4').value)||0)*200 + (parseInt(document.getElementById('in-6h6').value)||0)*50000) * multi;
-                const net = prize - cost;
-                document.getElementById('display-total-cost').innerText = "-$ " + cost.toLocaleString();
-                document.getElementById('display-total-prize').innerText = "+$ " + prize.toLocaleString();
-                const nd = document.getElementById('display-net-profit'); nd.innerText = (net >= 0 ? "+$ " : "-$ ") + Math.abs(net).toLocaleString();
-                nd.className = net >= 0 ? "text-lg font-black text-emerald-400" : "text-lg font-black text-rose-500";
-                runBacktest(); 
-            }
-
-            function resetDailyJournal() { if(confirm("確定重置數據？")) { localStorage.setItem('bingo_journal_v121', '{"cost":0, "prize":0}'); updateJournalDisplay(); } }
-
-            function runBacktest() {
-                const multi = parseInt(document.getElementById('in-multiplier').value) || 1;
-                const m3S = []; const m4S = []; const m6S = [];
-                for(let i=1; i<=10; i++) {
-                    const s3 = [1,2,3].map(j => Number(document.getElementById(`3s-g${i}n${j}`).value)).filter(n => n>0);
-                    const s4 = [1,2,3,4].map(j => Number(document.getElementById(`4s-g${i}n${j}`).value)).filter(n => n>0);
-                    const s6 = [1,2,3,4,5,6].map(j => Number(document.getElementById(`6s-g${i}n${j}`).value)).filter(n => n>0);
-                    if(s3.length === 3) m3S.push(s3); if(s4.length === 4) m4S.push(s4); if(s6.length === 6) m6S.push(s6);
-                }
-
-                let html = ""; let m3 = 0, m4 = 0, m6 = 0; let f3 = false, f4 = false, f6 = false;
-                let startNo3s = null; 
-
-                for (let i = 0; i < recentHistory.length; i++) {
-                    let hasJack3 = false;
-                    m3S.forEach(sq => { if(sq.filter(n => recentHistory[i].nums.includes(n)).length === 3) hasJack3 = true; });
-                    if(hasJack3) { if(i > 0) startNo3s = recentHistory[i-1].no; f3 = true; break; }
-                }
-                if(!f3 && recentHistory.length > 0) startNo3s = recentHistory[recentHistory.length - 1].no;
-
-                f3 = false; 
-                recentHistory.forEach((draw) => {
-                    let pPrize = 0; let details = []; let hBig3=false, hBig4=false, hBig6=false;
-                    m3S.forEach(sq => { const h = sq.filter(n => draw.nums.includes(n)).length; if(h===2) {pPrize+=50; details.push('<span class="badge-graphical badge-3s">3中2</span>');} else if(h===3) {pPrize+=1000; details.push('<span class="badge-graphical badge-jackpot">🏆 3中3</span>'); hBig3=true;} });
-                    m4S.forEach(sq => { const h = sq.filter(n => draw.nums.includes(n)).length; if(h===2) {pPrize+=25; details.push('<span class="badge-graphical badge-4s opacity-60">4中2</span>');} else if(h===3) {pPrize+=150; details.push('<span class="badge-graphical badge-4s">4中3</span>');} else if(h===4) {pPrize+=2000; details.push('<span class="badge-graphical badge-jackpot">🏆 4中4</span>'); hBig4=true;} });
-                    m6S.forEach(sq => { const h = sq.filter(n => draw.nums.includes(n)).length; 
-                        if(h===3) {pPrize+=25; details.push('<span class="badge-graphical badge-6s">6中3</span>');}
-                        else if(h===4) {pPrize+=200; details.push('<span class="badge-graphical badge-6s">6中4</span>');} 
-                        else if(h===5) {pPrize+=1200; details.push('<span class="badge-graphical badge-6s">6中5</span>');}
-                        else if(h===6) {pPrize+=50000; details.push('<span class="badge-graphical badge-jackpot">🏆 6星全中</span>'); hBig6=true;} 
-                    });
-                    if(!f3) { if(!hBig3) m3++; else f3 = true; }
-                    if(!f4) { if(!hBig4) m4++; else f4 = true; }
-                    if(!f6) { if(!hBig6) m6++; else f6 = true; }
-                    const finalP = pPrize * multi;
-                    const isStart3s = (draw.no === startNo3s);
-                    let cardHtml = `<div class="p-4 rounded-[2rem] border transition-all ${isStart3s ? 'streak-start-3s' : 'bg-slate-50 dark:bg-slate-800/40 border-slate-100 dark:border-slate-800'}"><div class="flex justify-between items-center mb-3"><span class="text-[12px] font-black text-indigo-600 dark:text-indigo-400"># ${draw.no}</span><span class="text-[9px] opacity-40 font-mono italic underline underline-offset-4">${draw.time}</span></div><div class="flex flex-wrap gap-1.5 mb-3">`;
-                    draw.nums.forEach(n => { const hit = m3S.some(s => s.includes(n)) || m4S.some(s => s.includes(n)) || m6S.some(s => s.includes(n)); cardHtml += `<span class="w-6 h-6 flex items-center justify-center text-[10px] rounded-full ${hit ? 'ball-hit scale-105' : 'bg-white dark:bg-slate-900 text-slate-300 dark:text-slate-600 border border-slate-100 dark:border-slate-800'}">${n.toString().padStart(2,'0')}</span>`; });
-                    cardHtml += `</div><div class="flex justify-between items-center border-t dark:border-slate-700/50 pt-3"><div class="flex flex-wrap gap-1">${details.join('')}</div><div class="text-right"><span class="text-[12px] font-black ${finalP>0?'text-emerald-500':'text-slate-400 opacity-20'}">$ ${finalP.toLocaleString()}</span></div></div></div>`;
-                    html += cardHtml;
-                });
-                document.getElementById('backtest-body').innerHTML = html;
-                document.getElementById('bt-count-3s').innerText = m3; document.getElementById('bt-count-4s').innerText = m4; document.getElementById('bt-count-6s').innerText = m6;
-                document.getElementById('bt-count-3s-live').innerText = m3; document.getElementById('bt-count-4s-live').innerText = m4; document.getElementById('bt-count-6s-live').innerText = m6;
-                const alertClass = (count) => count >= 15 ? "bt-miss-alert px-4 py-1.5 rounded-xl text-[9px] font-black" : "bt-miss-normal px-4 py-1.5 rounded-xl text-[9px] font-black";
-                document.getElementById('bt-box-3s').className = alertClass(m3); document.getElementById('bt-box-4s').className = alertClass(m4); document.getElementById('bt-box-6s').className = alertClass(m6);
-            }
-
-            function saveAndCompare() {
-                const d = { s3: {}, s4: {}, s6: {} };
-                for(let i=1; i<=10; i++) { 
-                    d.s3[i] = [1,2,3].map(j => document.getElementById(`3s-g${i}n${j}`).value); 
-                    d.s4[i] = [1,2,3,4].map(j => document.getElementById(`4s-g${i}n${j}`).value);
-                    d.s6[i] = [1,2,3,4,5,6].map(j => document.getElementById(`6s-g${i}n${j}`).value);
-                }
-                localStorage.setItem('bingo_v121_matrix', JSON.stringify(d)); executeComparison();
-            }
-
-            function executeComparison() {
-                document.querySelectorAll('.ball-all').forEach(el => { for(let i=1; i<=10; i++) el.classList.remove(`hit-g${i}`); });
-                document.querySelectorAll('.dist-ball').forEach(el => el.classList.remove('active-3s', 'active-4s', 'active-6s'));
-                for(let i=1; i<=10; i++) {
-                    document.getElementById(`set-3s-${i}`)?.classList.remove('matrix-jackpot');
-                    document.getElementById(`set-4s-${i}`)?.classList.remove('matrix-jackpot');
-                    document.getElementById(`set-6s-${i}`)?.classList.remove('matrix-jackpot');
-                }
-
-                let st = { s3_2: 0, s3_3: 0, s4_2: 0, s4_3: 0, s4_4: 0, s6_3:0, s6_4:0, s6_5:0, s6_6:0 }; 
-                for(let i=1; i<=10; i++) {
-                    const sq3 = [1,2,3].map(j => Number(document.getElementById(`3s-g${i}n${j}`).value)).filter(n => n > 0);
-                    // 💡 新增：三星 100 期全中統計
-                    if(sq3.length === 3) {
-                        let hj3 = 0; recentHistory.forEach(draw => { if(sq3.filter(n => draw.nums.includes(n)).length === 3) hj3++; });
-                        const el3 = document.getElementById(`jack-stat-3s-${i}`);
-                        if(el3) {
-                            el3.innerText = `🏆 100期: ${hj3}`;
-                            el3.className = hj3 > 0 ? "text-[7px] bg-amber-500 text-black px-1.5 py-0.5 rounded-full font-black scale-110" : "text-[7px] bg-black/40 px-1.5 py-0.5 rounded-full text-slate-400";
-                        }
-                    }
-                    let h3 = 0; sq3.forEach(n => { document.getElementById(`dist3s-${n}`)?.classList.add('active-3s'); if(winNums.includes(n)) h3++; });
-                    if(h3 === 3 && sq3.length === 3) { st.s3_3++; document.getElementById(`set-3s-${i}`).classList.add('matrix-jackpot'); }
-                    else if(h3 === 2) st.s3_2++;
-
-                    const sq4 = [1,2,3,4].map(j => Number(document.getElementById(`4s-g${i}n${j}`).value)).filter(n => n > 0);
-                    // 💡 新增：四星 100 期全中統計
-                    if(sq4.length === 4) {
-                        let hj4 = 0; recentHistory.forEach(draw => { if(sq4.filter(n => draw.nums.includes(n)).length === 4) hj4++; });
-                        const el4 = document.getElementById(`jack-stat-4s-${i}`);
-                        if(el4) {
-                            el4.innerText = `🏆 100期: ${hj4}`;
-                            el4.className = hj4 > 0 ? "text-[7px] bg-indigo-500 text-white px-1.5 py-0.5 rounded-full font-black scale-110" : "text-[7px] bg-black/40 px-1.5 py-0.5 rounded-full text-slate-400";
-                        }
-                    }
-                    let h4 = 0; sq4.forEach(n => { document.getElementById(`dist4s-${n}`)?.classList.add('active-4s'); if(winNums.includes(n)) h4++; });
-                    if(h4 === 4 && sq4.length === 4) { st.s4_4++; document.getElementById(`set-4s-${i}`).classList.add('matrix-jackpot'); }
-                    else if(h4 === 3) st.s4_3++; else if(h4 === 2) st.s4_2++;
-
-                    const sq6 = [1,2,3,4,5,6].map(j => Number(document.getElementById(`6s-g${i}n${j}`).value)).filter(n => n > 0);
-                    // 💡 六星 100 期全中統計
-                    if(sq6.length === 6) {
-                        let hj6 = 0; recentHistory.forEach(draw => { if(sq6.filter(n => draw.nums.includes(n)).length === 6) hj6++; });
-                        const el6 = document.getElementById(`jack-stat-6s-${i}`);
-                        if(el6) {
-                            el6.innerText = `🏆 100期: ${hj6}`;
-                            el6.className = hj6 > 0 ? "text-[7px] bg-rose-500 text-white px-1.5 py-0.5 rounded-full font-black scale-110" : "text-[7px] bg-black/40 px-1.5 py-0.5 rounded-full text-slate-400";
-                        }
-                    }
-                    let h6 = 0; sq6.forEach(n => { document.getElementById(`dist6s-${n}`)?.classList.add('active-6s'); if(winNums.includes(n)) h6++; });
-                    if(h6 === 6 && sq6.length === 6) { st.s6_6++; document.getElementById(`set-6s-${i}`).classList.add('matrix-jackpot'); }
-                    else if(h6 === 5) st.s6_5++; else if(h6 === 4) st.s6_4++; else if(h6 === 3) st.s6_3++;
-                }
-
-                document.getElementById('count-3s-2').innerText = st.s3_2; document.getElementById('count-3s-3').innerText = st.s3_3;
-                document.getElementById('count-4s-2').innerText = st.s4_2; document.getElementById('count-4s-3').innerText = st.s4_3; document.getElementById('count-4s-4').innerText = st.s4_4;
-                document.getElementById('count-6s-3').innerText = st.s6_3; document.getElementById('count-6s-4').innerText = st.s6_4;
-                document.getElementById('count-6s-5').innerText = st.s6_5; document.getElementById('count-6s-6').innerText = st.s6_6;
-                
-                const c3 = document.getElementById('card-3s'); if(st.s3_3 > 0) c3.classList.add('alert-jackpot-glow'); else c3.classList.remove('alert-jackpot-glow');
-                const c4 = document.getElementById('card-4s'); if(st.s4_4 > 0) c4.classList.add('alert-jackpot-glow'); else c4.classList.remove('alert-jackpot-glow');
-                const c6 = document.getElementById('card-6s'); if(st.s6_6 > 0) c6.classList.add('alert-jackpot-glow'); else c6.classList.remove('alert-jackpot-glow');
-                
-                calculateProfit();
-            }
-
-            function init() {
-                const isDark = localStorage.getItem('bingo_v121_dark') !== 'false';
-                if(isDark) { document.documentElement.classList.add('dark'); updateThemeUI(true); }
-                const s = localStorage.getItem('bingo_v121_matrix');
-                if(s) { const d = JSON.parse(s); 
-                    for(let i=1; i<=10; i++) { 
-                        if(d.s3[i]) d.s3[i].forEach((v, j) => { if(document.getElementById(`3s-g${i}n${j+1}`)) document.getElementById(`3s-g${i}n${j+1}`).value = v; }); 
-                        if(d.s4[i]) d.s4[i].forEach((v, j) => { if(document.getElementById(`4s-g${i}n${j+1}`)) document.getElementById(`4s-g${i}n${j+1}`).value = v; }); 
-                        if(d.s6[i]) d.s6[i].forEach((v, j) => { if(document.getElementById(`6s-g${i}n${j+1}`)) document.getElementById(`6s-g${i}n${j+1}`).value = v; }); 
-                    }
-                }
-                executeComparison();
-            }
-            window.onload = init;
-        </script>
-    </body>
-    </html>
-    """
-    from jinja2 import Template
-    template = Template(html_content)
-    return template.render(res_3star=res_3star, res_4star=res_4star, res_6star=res_6star, p_day=p_day, s_day=s_day, p_20=p_20, s_20=s_20, status=status, latest_win=latest_win, latest_no=latest_no, latest_time=latest_time, active_date=active_date, exclusive=exclusive, recent_history=recent_history)
-
-if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
+from contextlib import asynccontextmanager
+from pydantic import BaseModel
+import httpx
+import numpy as np
+import argparse
+import asyncio
+import bisect
+import collections
+import dataclasses
+import concurrent.futures
+import contextlib
+import contextvars
+import datetime
+import email.utils
+import gzip
+import hashlib
+import itertools
+import jinja2
+import uvicorn
+import json
+import mmap
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# --- 0.0 監控指標 (各階段計時 / 上游狀態 / 快取命中率; /metrics 以 Prometheus 文字格式輸出) ---
+
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SERVER_TIMING = os.environ.get("BINGO_SERVER_TIMING", "0") == "1"
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}    # (name, labels) -> 累計值
+        self.histograms = {}  # (name, labels) -> [各 bucket 次數..., +Inf, 總和, 次數]
+        self.collectors = []  # 輸出時才讀取的即時數值 (快取命中、連線數...)
+        self.active_requests = 0
+
+    def inc(self, name, labels=(), value=1):
+        key = (name, labels)
+        with self._lock: self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, labels=()):
+        key = (name, labels)
+        with self._lock:
+            h = self.histograms.get(key)
+            if h is None: h = self.histograms[key] = [0] * (len(STAGE_BUCKETS) + 3)
+            h[bisect.bisect_left(STAGE_BUCKETS, value)] += 1; h[-2] += value; h[-1] += 1
+
+    @contextlib.contextmanager
+    def span(self, stage):
+        t0 = time.perf_counter()
+        try: yield
+        finally:
+            dt = time.perf_counter() - t0
+            self.observe("bingo_stage_seconds", dt, (("stage", stage),))
+            timings = _request_timings.get()
+            if timings is not None: timings.append((stage, dt))
+
+    def collector(self, fn):
+        self.collectors.append(fn)
+        return fn
+
+    def render(self):
+        fmt = lambda labels: "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}" if labels else ""
+        lines, typed = [], set()
+        def declare(name, kind):
+            if name not in typed: typed.add(name); lines.append(f"# TYPE {name} {kind}")
+        with self._lock:
+            counters = sorted(self.counters.items()); histograms = sorted((k, list(v)) for k, v in self.histograms.items())
+        for (name, labels), value in counters:
+            declare(name, "counter"); lines.append(f"{name}{fmt(labels)} {value}")
+        for (name, labels), h in histograms:
+            declare(name, "histogram")
+            acc = 0
+            for le, n in zip((*STAGE_BUCKETS, "+Inf"), h[:-2]):
+                acc += n; lines.append(f"{name}_bucket{fmt(labels + (('le', le),))} {acc}")
+            lines.append(f"{name}_sum{fmt(labels)} {h[-2]:.6f}"); lines.append(f"{name}_count{fmt(labels)} {h[-1]}")
+        # 同名指標必須連續輸出, 所以先收齊再依名稱排序
+        for name, kind, labels, value in sorted((row for fn in self.collectors for row in fn()), key=lambda row: row[0]):
+            declare(name, kind); lines.append(f"{name}{fmt(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+
+class MetricsMiddleware:
+    # 純 ASGI middleware: 每個請求只多幾次 perf_counter 與 dict 更新, 可常駐開啟
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http": return await self.app(scope, receive, send)
+        timings = [] if SERVER_TIMING or b"timing=1" in scope.get("query_string", b"") else None
+        token = _request_timings.set(timings)
+        t0 = time.perf_counter(); status = [500]
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                if timings is not None:
+                    parts = [f"{name};dur={dt * 1000:.2f}" for name, dt in timings] + [f"total;dur={(time.perf_counter() - t0) * 1000:.2f}"]
+                    message["headers"] = [*message.get("headers", []), (b"server-timing", ", ".join(parts).encode())]
+            await send(message)
+        metrics.active_requests += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.active_requests -= 1
+            path = getattr(scope.get("route"), "path", "unmatched")
+            metrics.observe("bingo_http_request_seconds", time.perf_counter() - t0, (("path", path),))
+            metrics.inc("bingo_http_requests_total", (("path", path), ("status", str(status[0]))))
+            _request_timings.reset(token)
+
+# --- 0. 上游連線 (多個資料來源依序容錯, 各自斷路; 全部失敗時沿用最後一份成功的資料) ---
+
+DRAW_INTERVAL = 300
+UPSTREAM_URL = "https://winwin.tw/Bingo/GetBingoData"
+UPSTREAM_HEADERS = {'User-Agent': 'Mozilla/5.0', 'Referer': 'https://winwin.tw/Bingo'}
+UPSTREAM_TIMEOUT = httpx.Timeout(4.0, connect=2.0)
+UPSTREAM_RETRIES = 2
+UPSTREAM_DEADLINE = 8.0  # 同一日期所有來源與重試加總的時間上限, 慢上游不會拖住請求兩輪完整逾時
+BREAKER_FAILURES = 3     # 連續失敗幾次後斷路, 之後直接跳到下一個來源
+BREAKER_RESET = 30       # 斷路多久後放一個探測請求
+LAST_GOOD_SIZE = 8
+# 逗號分隔, 依序嘗試: winwin (官方端點) / http(s) 網址 (鏡像或本地替身) / 本地 JSON 檔或每天一檔的目錄
+UPSTREAM_SOURCES = os.environ.get("BINGO_SOURCES", "winwin")
+
+_http_client = None
+
+def get_http_client():
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(headers=UPSTREAM_HEADERS, timeout=UPSTREAM_TIMEOUT,
+                                         limits=httpx.Limits(max_connections=20, max_keepalive_connections=10))
+    return _http_client
+
+class UpstreamError(Exception):
+    pass
+
+class CircuitBreaker:
+    def __init__(self, failures=BREAKER_FAILURES, reset=BREAKER_RESET):
+        self.failures = failures; self.reset = reset
+        self.errors = 0; self.opened_at = None
+
+    @property
+    def state(self):
+        if self.opened_at is None: return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.reset else "open"
+
+    def allow(self):
+        state = self.state
+        # 冷卻結束只放行一個探測請求: 重新計時, 其他請求在探測結果出來前仍視為斷路
+        if state == "half_open": self.opened_at = time.monotonic()
+        return state != "open"
+
+    def success(self):
+        self.errors = 0; self.opened_at = None
+
+    def failure(self):
+        self.errors += 1
+        if self.errors >= self.failures: self.opened_at = time.monotonic()
+
+class HttpSource:
+    def __init__(self, name, url):
+        self.name = name; self.url = url
+        self.breaker = CircuitBreaker()
+
+    async def fetch(self, date_str, deadline):
+        client = get_http_client()
+        labels = (("source", self.name),)
+        for attempt in range(UPSTREAM_RETRIES + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0: break
+            t0 = time.perf_counter()
+            try:
+                resp = await asyncio.wait_for(client.get(self.url, params={"date": date_str}), remaining)
+                metrics.observe("bingo_upstream_seconds", time.perf_counter() - t0, labels)
+                metrics.inc("bingo_upstream_requests_total", (*labels, ("status", str(resp.status_code))))
+                if resp.status_code == 200:
+                    with metrics.span("json_decode"): data = resp.json()
+                    if isinstance(data, list): return data
+                    metrics.inc("bingo_upstream_errors_total", (*labels, ("kind", "decode")))
+                # 其他 4xx 代表這個日期本來就沒有資料, 不是上游故障
+                elif resp.status_code < 500 and resp.status_code != 429: return []
+            except (asyncio.TimeoutError, httpx.TimeoutException): metrics.inc("bingo_upstream_errors_total", (*labels, ("kind", "timeout")))
+            except httpx.HTTPError: metrics.inc("bingo_upstream_errors_total", (*labels, ("kind", "transport")))
+            except ValueError: metrics.inc("bingo_upstream_errors_total", (*labels, ("kind", "decode")))
+            backoff = 0.5 * 2 ** attempt + random.random() * 0.2
+            if attempt == UPSTREAM_RETRIES or time.monotonic() + backoff >= deadline: break
+            await asyncio.sleep(backoff)
+        raise UpstreamError(f"{self.name}: no usable response for {date_str}")
+
+class FileSource:
+    # 單一 JSON 檔 ({日期: [上游資料]} 或上游資料陣列), 或每天一個 YYYY-MM-DD.json 的目錄
+    def __init__(self, name, path):
+        self.name = name; self.path = path
+        self.breaker = CircuitBreaker()
+
+    def _read(self, date_str):
+        path = os.path.join(self.path, f"{date_str}.json") if os.path.isdir(self.path) else self.path
+        if not os.path.exists(path): return []
+        try:
+            with open(path, encoding="utf-8") as f: data = json.load(f)
+        except (OSError, ValueError) as e: raise UpstreamError(f"{self.name}: {e}")
+        if isinstance(data, dict): return data.get(date_str, [])
+        return [item for item in data if str(item.get('OpenDate', ''))[:10] == date_str]
+
+    async def fetch(self, date_str, deadline):
+        return await asyncio.to_thread(self._read, date_str)
+
+def parse_sources(spec):
+    sources = []
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        if part == "winwin": sources.append(HttpSource("winwin", UPSTREAM_URL))
+        elif part.startswith(("http://", "https://")): sources.append(HttpSource(httpx.URL(part).netloc.decode(), part))
+        else: sources.append(FileSource(os.path.basename(part.rstrip("/\\")) or part, part))
+    return sources
+
+upstream_sources = parse_sources(UPSTREAM_SOURCES)
+_last_good = collections.OrderedDict()  # 日期 -> 最後一次成功取得的非空資料
+
+async def fetch_api(date_str):
+    deadline = time.monotonic() + UPSTREAM_DEADLINE
+    for k, source in enumerate(upstream_sources):
+        # 斷路中的來源直接跳過, 故障期間不必每次都等逾時才換下一個
+        if not source.breaker.allow():
+            metrics.inc("bingo_upstream_skipped_total", (("source", source.name),)); continue
+        # 剩餘時間平分給還沒試的來源, 慢的主來源不會吃掉備援的時間
+        now = time.monotonic()
+        if now >= deadline: break
+        try: data = await source.fetch(date_str, now + (deadline - now) / (len(upstream_sources) - k))
+        except UpstreamError:
+            source.breaker.failure(); continue
+        source.breaker.success()
+        # 空結果 (還沒開獎, 或來源資料落後) 換下一個來源再問
+        if data:
+            _last_good[date_str] = data; _last_good.move_to_end(date_str)
+            while len(_last_good) > LAST_GOOD_SIZE: _last_good.popitem(last=False)
+            return data
+    # 所有來源都失敗或沒資料: 回最後一份成功的資料, 而不是空資料 (空資料會讓頁面變成 0:0 / N/A)
+    if date_str in _last_good: metrics.inc("bingo_upstream_stale_total")
+    return _last_good.get(date_str, [])
+
+@asynccontextmanager
+async def lifespan(app):
+    get_http_client()
+    if shared is not None: shared.start()
+    elif POLL_ENABLED: poller.start()
+    yield
+    await poller.stop()
+    if shared is not None: await shared.stop()
+    if _http_client is not None: await _http_client.aclose()
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+
+# --- 0.1 開獎資料快取 (歷史日期永久保存, 今日依 5 分鐘開獎節奏過期, 同日期併發只打一次上游) ---
+
+class DrawCache:
+    def __init__(self, interval=DRAW_INTERVAL, stale_for=DRAW_INTERVAL):
+        self.interval = interval
+        self.stale_for = stale_for  # 過期後這段時間內先回舊資料, 同時在背景更新 (stale-while-revalidate)
+        self.hits = 0; self.misses = 0; self.coalesced = 0; self.stale = 0
+        self._data = {}; self._inflight = {}
+
+    def _expires_at(self, date_str):
+        now = datetime.datetime.now()
+        if date_str < now.strftime("%Y-%m-%d"):
+            # 跨日後第一個開獎週期內昨日仍可能補進最後幾期, 先照今日規則過期
+            is_yesterday = date_str == (now - datetime.timedelta(days=1)).strftime("%Y-%m-%d")
+            if not is_yesterday or now.hour * 3600 + now.minute * 60 + now.second >= self.interval: return None
+        ts = time.time()
+        return ts - ts % self.interval + self.interval
+
+    async def get(self, date_str, loader=None):
+        entry = self._data.get(date_str)
+        if entry and (entry[1] is None or time.time() < entry[1]):
+            self.hits += 1; return entry[0]
+        pending = self._inflight.get(date_str)
+        if entry and time.time() < entry[1] + self.stale_for:
+            # 剛過期: 不讓請求等上游, 先回舊資料並在背景更新 (同日期只會有一個更新在跑)
+            self.stale += 1
+            if pending is None: self._load(date_str, loader)
+            return entry[0]
+        if pending is not None:
+            # 同一日期已有請求在抓, 直接等它的結果 (shield 避免單一客戶端斷線取消共用的抓取)
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+        self.misses += 1
+        return await asyncio.shield(self._load(date_str, loader))
+
+    def _load(self, date_str, loader):
+        pending = self._inflight[date_str] = asyncio.ensure_future(self._fill(date_str, loader))
+        pending.add_done_callback(lambda f: f.cancelled() or f.exception())  # 背景更新失敗不留未讀取的例外
+        return pending
+
+    async def _fill(self, date_str, loader):
+        try:
+            data = await (loader or fetch_api)(date_str)
+        finally:
+            self._inflight.pop(date_str, None)
+        # 空結果多半是上游失敗, 不寫入快取以免把錯誤結果留到下個週期
+        if data: self._data[date_str] = (data, self._expires_at(date_str))
+        return data
+
+    def put(self, date_str, data):
+        self._data[date_str] = (data, self._expires_at(date_str))
+
+    def stats(self):
+        total = self.hits + self.misses + self.coalesced + self.stale
+        return {"hits": self.hits, "misses": self.misses, "coalesced": self.coalesced, "stale": self.stale, "entries": len(self._data),
+                "hit_rate": round((self.hits + self.coalesced + self.stale) / total, 4) if total else 0.0}
+
+draw_cache = DrawCache()
+
+# --- 0.2 本地開獎資料庫 (只增不改, 20 顆號碼壓成 80 bit 定長遮罩, 依日期與期號索引) ---
+
+DB_PATH = os.environ.get("BINGO_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "bingo_draws.sqlite3"))
+DAY_DRAWS = 203  # 07:05 ~ 23:55 每 5 分鐘一期
+
+def encode_nums(nums):
+    mask = 0
+    for n in nums: mask |= 1 << (n - 1)
+    return mask.to_bytes(10, "little")
+
+def decode_nums(blob):
+    mask = int.from_bytes(blob, "little")
+    return [i + 1 for i in range(80) if mask >> i & 1]
+
+class DrawStore:
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:": self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS draws (no INTEGER PRIMARY KEY, draw_date TEXT NOT NULL, open_time TEXT NOT NULL, nums BLOB NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_draws_date ON draws (draw_date, no)")
+        self._conn.commit()
+
+    def add_items(self, raw):
+        rows = []
+        for item in raw:
+            nums = parse_draw(item); open_date = item.get('OpenDate', '')
+            if nums and isinstance(item.get('No'), int) and 'T' in open_date:
+                rows.append((item['No'], open_date[:10], open_date[:19], encode_nums(nums)))
+        if not rows: return 0
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany("INSERT OR IGNORE INTO draws VALUES (?, ?, ?, ?)", rows)
+            self._conn.commit()
+            return self._conn.total_changes - before
+
+    def _query(self, sql, args=()):
+        with self._lock: return self._conn.execute(sql, args).fetchall()
+
+    @staticmethod
+    def to_item(row):
+        # 還原成上游 API 的格式, 分析端不必區分資料來源
+        return {"No": row[0], "OpenDate": row[2], "BigShowOrder": ",".join(f"{n:02d}" for n in decode_nums(row[3]))}
+
+    def latest(self, limit, until_date=None):
+        if until_date: rows = self._query("SELECT no, draw_date, open_time, nums FROM draws WHERE draw_date <= ? ORDER BY no DESC LIMIT ?", (until_date, limit))
+        else: rows = self._query("SELECT no, draw_date, open_time, nums FROM draws ORDER BY no DESC LIMIT ?", (limit,))
+        return [self.to_item(r) for r in rows]
+
+    def latest_matrix(self, limit, until_no=None, until_date=None):
+        # 回測用: 只取期號/時間與遮罩, 直接展開成開獎矩陣 (第 0 列最新)
+        where, args = [], []
+        if until_no: where.append("no <= ?"); args.append(until_no)
+        if until_date: where.append("draw_date <= ?"); args.append(until_date)
+        sql = "SELECT no, open_time, nums FROM draws" + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY no DESC LIMIT ?"
+        rows = self._query(sql, (*args, limit))
+        return [r[0] for r in rows], [r[1] for r in rows], masks_matrix([r[2] for r in rows])
+
+    def page(self, offset, limit, until_no=None):
+        if until_no: return self._query("SELECT no, open_time, nums FROM draws WHERE no <= ? ORDER BY no DESC LIMIT ? OFFSET ?", (until_no, limit, offset))
+        return self._query("SELECT no, open_time, nums FROM draws ORDER BY no DESC LIMIT ? OFFSET ?", (limit, offset))
+
+    def by_date(self, date_str):
+        return [self.to_item(r) for r in self._query("SELECT no, draw_date, open_time, nums FROM draws WHERE draw_date = ? ORDER BY no DESC", (date_str,))]
+
+    def by_no(self, no):
+        rows = self._query("SELECT no, draw_date, open_time, nums FROM draws WHERE no = ?", (no,))
+        return self.to_item(rows[0]) if rows else None
+
+    def count_by_date(self, date_str):
+        return self._query("SELECT COUNT(*) FROM draws WHERE draw_date = ?", (date_str,))[0][0]
+
+    def count(self):
+        return self._query("SELECT COUNT(*) FROM draws")[0][0]
+
+    def count_between(self, start, end):
+        return self._query("SELECT COUNT(*) FROM draws WHERE draw_date BETWEEN ? AND ?", (start, end))[0][0]
+
+    def load_fixture(self, path):
+        # 測試用: 讀入 {日期: [上游資料]} 或上游資料陣列的 JSON 檔, 不需連網
+        with open(path, encoding="utf-8") as f: data = json.load(f)
+        return self.add_items([item for items in data.values() for item in items] if isinstance(data, dict) else data)
+
+_store = None
+
+def get_store():
+    global _store
+    if _store is None: _store = DrawStore()
+    return _store
+
+async def backfill(start, end, concurrency=4):
+    store = get_store()
+    today = datetime.date.today()
+    day, last = datetime.date.fromisoformat(start), min(datetime.date.fromisoformat(end), today)
+    dates = []
+    while day <= last:
+        d = day.isoformat()
+        # 過去日期抓過一次就不再重抓, 只補不足一整天的
+        if day == today or store.count_by_date(d) < DAY_DRAWS: dates.append(d)
+        day += datetime.timedelta(days=1)
+    sem = asyncio.Semaphore(concurrency)
+    async def one(d):
+        async with sem: return d, store.add_items(await fetch_api(d))
+    total = 0
+    for fut in asyncio.as_completed([one(d) for d in dates]):
+        d, added = await fut; total += added
+        print(f"[backfill] {d}: +{added}")
+    return total
+
+# --- 1. 核心量化分析邏輯 (穩定維持 100 期回測視野) ---
+
+def parse_date(date_str):
+    try: return datetime.date.fromisoformat(date_str)
+    except (TypeError, ValueError): raise HTTPException(status_code=422, detail=f"invalid date: {date_str!r}, expected YYYY-MM-DD")
+
+async def ensure_archived(store, dates):
+    # 資料庫沒有或不滿一整天的日期才向上游補抓 (今日一律經快取更新), 同時抓取
+    today = datetime.date.today().isoformat()
+    missing = [d for d in dates if d <= today and (d == today or store.count_by_date(d) < DAY_DRAWS)]
+    for raw in await asyncio.gather(*(draw_cache.get(d) for d in missing)): store.add_items(raw)
+
+async def get_data_and_analyze(target_date=None, mode_exclusive=True):
+    day = parse_date(target_date) if target_date else datetime.date.today()
+    target_date = day.isoformat()
+    # 回看視窗以指定日期為準: 指定日期與它的前一天, 而不是「現在」的昨天
+    store = get_store()
+    with metrics.span("fetch"): await ensure_archived(store, [target_date, (day - datetime.timedelta(days=1)).isoformat()])
+    # 分析本身是 CPU 工作, 丟到執行緒避免卡住事件迴圈
+    return await asyncio.to_thread(analyze_stored, store, target_date, mode_exclusive)
+
+def analyze_stored(store, target_date, mode_exclusive=True):
+    # 當日全部期數 (今日累計比例要用整天) + 前面補滿分析視窗
+    with metrics.span("archive_read"):
+        data_today = store.by_date(target_date)
+        before = (datetime.date.fromisoformat(target_date) - datetime.timedelta(days=1)).isoformat()
+        data_before = store.latest(ANALYSIS_DEPTH, until_date=before)
+    return analyze_draws(data_today, data_before, target_date, mode_exclusive)
+
+# 評分參數: 預設值即原本寫死的數字; 參數掃描 (sweep) 選出的最佳組合存成 JSON, 啟動時自動載入
+@dataclasses.dataclass(frozen=True)
+class ScoringParams:
+    co_occ_window: int = 200
+    long_window: int = 50
+    short_window: int = 15
+    ratio_window: int = 20
+    streak1_bonus: float = 5.0
+    streak2_bonus: float = 2.0
+    streak_penalty: float = -15.0
+    streak_cap: int = 3
+    ratio_weight: float = 1.2
+    heat_weight: float = 2.0
+    ratio_threshold: float = 0.4  # 近 ratio_window 期某一邊球數 <= 40% 視為偏冷 (20 期即 160/400)
+
+    @property
+    def ratio_limit(self):
+        return int(round(self.ratio_threshold * self.ratio_window * 20))
+
+    @property
+    def depth(self):
+        return max(self.co_occ_window, self.long_window, self.short_window, self.ratio_window)
+
+PARAMS_PATH = os.environ.get("BINGO_PARAMS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "scoring_params.json"))
+
+def load_params(path=PARAMS_PATH):
+    if not os.path.exists(path): return ScoringParams()
+    with open(path, encoding="utf-8") as f: data = json.load(f)
+    fields = {f.name for f in dataclasses.fields(ScoringParams)}
+    return ScoringParams(**{k: v for k, v in data.get("params", data).items() if k in fields})
+
+PARAMS = load_params()
+CO_OCC_WINDOW = PARAMS.co_occ_window; LONG_WINDOW = PARAMS.long_window; SHORT_WINDOW = PARAMS.short_window; RATIO_WINDOW = PARAMS.ratio_window; HISTORY_WINDOW = 100
+ANALYSIS_DEPTH = max(PARAMS.depth, HISTORY_WINDOW)
+
+def parse_draw(item):
+    draw_str = item.get('BigShowOrder', '')
+    if not draw_str: return None
+    nums = [int(n) for n in draw_str.split(',') if n.strip().isdigit()]
+    return nums if len(nums) == 20 else None
+
+def draw_time(item):
+    raw_date = item.get('OpenDate', '')
+    return raw_date[11:16] if 'T' in raw_date else '--:--'
+
+def ratio_status(o_20, s_20, params=PARAMS):
+    total = params.ratio_window * 20; limit = params.ratio_limit
+    e_20 = total - o_20; b_20 = total - s_20
+    return e_20, b_20, {'odd': o_20 <= limit, 'even': e_20 <= limit, 'small': s_20 <= limit, 'big': b_20 <= limit}
+
+# 向量化引擎: 開獎以 N x 80 布林矩陣表示 (第 0 列為最新一期, 第 j 欄為號碼 j+1)
+NUMBERS = np.arange(1, 81)
+ODD_COLS = NUMBERS % 2 != 0
+SMALL_COLS = NUMBERS <= 40
+
+def draws_matrix(draws):
+    m = np.zeros((len(draws), 80), dtype=bool)
+    for r, nums in enumerate(draws): m[r, np.asarray(nums) - 1] = True
+    return m
+
+def masks_matrix(blobs):
+    # 資料庫的 10 byte 遮罩直接展開, 不經過字串解析
+    if not blobs: return np.zeros((0, 80), dtype=bool)
+    packed = np.frombuffer(b"".join(blobs), dtype=np.uint8).reshape(-1, 10)
+    return np.unpackbits(packed, axis=1, bitorder="little").astype(bool)
+
+def streak_counts(m):
+    # 每個號碼從最新一期往回連續開出的期數
+    if not len(m): return np.zeros(80, dtype=np.int64)
+    return np.where(m.all(axis=0), len(m), (~m).argmax(axis=0))
+
+def co_occurrence(m):
+    v = m.astype(np.int32)
+    return v.T @ v
+
+def window_stats(m, params=PARAMS):
+    recent_20 = m[:params.ratio_window]
+    return {"co_occ": co_occurrence(m[:params.co_occ_window]), "long_freq": m[:params.long_window].sum(axis=0), "short_heat": m[:params.short_window].sum(axis=0),
+            "o_20": int(recent_20[:, ODD_COLS].sum()), "s_20": int(recent_20[:, SMALL_COLS].sum()), "streaks": streak_counts(m)}
+
+def score_numbers(long_freq, short_heat, streaks, status, params=PARAMS):
+    l_penalty = np.where(streaks >= params.streak_cap, params.streak_penalty, 0.0)
+    bonus = np.where(streaks == 1, params.streak1_bonus, np.where(streaks == 2, params.streak2_bonus, 0.0))
+    cur_wp = np.where((ODD_COLS & status['odd']) | (~ODD_COLS & status['even']), params.ratio_weight, 1.0)
+    cur_ws = np.where((SMALL_COLS & status['small']) | (~SMALL_COLS & status['big']), params.ratio_weight, 1.0)
+    final_score = (long_freq + bonus + l_penalty) * cur_wp * cur_ws - (short_heat * params.heat_weight)
+    # 逐一用 Python round, 確保與逐號計算的分數完全一致 (np.round 的進位方式不同)
+    return [{'no': i + 1, 'score': round(float(x), 1)} for i, x in enumerate(final_score)]
+
+class SquadGenerator:
+    # 每個快照只算一次: 每個號碼的夥伴依 (同開次數, 分數) 由高到低排好, 之後產生組合只需線性掃描
+    def __init__(self, pool, co_occ):
+        self.pool = pool
+        nos = np.array([p['no'] for p in pool]); scores = np.array([p['score'] for p in pool])
+        syn = np.asarray(co_occ)[np.ix_(nos - 1, nos - 1)]
+        # 與原本 sorted(..., reverse=True) 一致: 同分時維持號碼由小到大
+        self.seeds = nos[np.lexsort((nos, -scores))].tolist()
+        order = np.lexsort((np.broadcast_to(np.arange(len(nos)), syn.shape), np.broadcast_to(-scores, syn.shape), -syn), axis=-1)
+        self.ranking = {int(n): [x for x in nos[row].tolist() if x != n] for n, row in zip(nos, order)}
+
+    def generate(self, size, count, exclusive, cat_used=None):
+        cat_used = set() if cat_used is None else cat_used
+        squads = []
+        fingerprints = set()
+        for i in range(count):
+            seed_no = self.seeds[i % len(self.seeds)]
+            all_partners = [p for p in self.ranking[seed_no] if p not in cat_used] if exclusive else self.ranking[seed_no]
+            # 組合超過號碼池時 (例如 100 組), 第二輪起同一個種子從下一批夥伴開始
+            offset = (i // len(self.seeds)) * (size - 1)
+            if offset: all_partners = all_partners[offset:] + all_partners[:offset]
+            if len(all_partners) < size - 1 and (exclusive or offset): break
+            p_idx = size - 1
+            cur_squad = sorted([seed_no] + all_partners[:p_idx])
+            while tuple(cur_squad) in fingerprints and p_idx < len(all_partners):
+                cur_squad = sorted([seed_no] + all_partners[:p_idx-1] + [all_partners[p_idx]])
+                p_idx += 1
+            fingerprints.add(tuple(cur_squad))
+            if exclusive: cat_used.update(cur_squad)
+            squads.append({"id": i+1, "picks": cur_squad})
+        return squads
+
+def generate_squads_smart(pool, size, count, exclusive, cat_used, co_occ):
+    return SquadGenerator(pool, co_occ).generate(size, count, exclusive, cat_used)
+
+def build_squads(all_analysis, co_occ, exclusive, generator=None):
+    generator = generator or SquadGenerator(all_analysis, co_occ)
+    return tuple(generator.generate(size, 10, exclusive) for size in (3, 4, 6))
+
+def day_ratio(odd, small, total):
+    return f"{odd}:{total - odd}", f"{small}:{total - small}"
+
+def analyze_draws(data_today, data_yesterday, target_date, mode_exclusive=True):
+    full_raw_data = data_today + data_yesterday 
+
+    if not full_raw_data:
+        return [], [], [], "0:0", "0:0", "0:0", "0:0", {}, [], "N/A", "--:--", target_date, []
+
+    all_draws = []
+    recent_history = [] 
+    with metrics.span("parse"):
+        for item in full_raw_data:
+            nums = parse_draw(item)
+            if nums:
+                all_draws.append(nums)
+                if len(recent_history) < HISTORY_WINDOW:
+                    recent_history.append({"no": item.get('No'), "time": draw_time(item), "nums": nums})
+        today_m = draws_matrix([d for d in (parse_draw(item) for item in data_today) if d])
+    
+    latest_no = full_raw_data[0].get('No', 'N/A')
+    latest_time = draw_time(full_raw_data[0])
+    latest_win_nums = all_draws[0] if all_draws else []
+
+    with metrics.span("window_stats"): ws = window_stats(draws_matrix(all_draws))
+    o_20, s_20 = ws["o_20"], ws["s_20"]
+    with metrics.span("score"):
+        e_20, b_20, status = ratio_status(o_20, s_20)
+        all_analysis = score_numbers(ws["long_freq"], ws["short_heat"], ws["streaks"], status)
+
+    with metrics.span("squads"): res_3star, res_4star, res_6star = build_squads(all_analysis, ws["co_occ"], mode_exclusive)
+
+    p_day, s_day = day_ratio(int(today_m[:, ODD_COLS].sum()), int(today_m[:, SMALL_COLS].sum()), int(today_m.sum()))
+
+    return (res_3star, res_4star, res_6star, p_day, s_day, f"{o_20}:{e_20}", f"{s_20}:{b_20}", status, latest_win_nums, latest_no, latest_time, target_date, recent_history)
+
+# --- 1.1 增量分析狀態 (每期新開獎只更新滑動視窗, 頁面只讀已發布的快照) ---
+
+Snapshot = collections.namedtuple("Snapshot", "latest_no date built_at results generator scores")
+
+class DrawState:
+    def __init__(self, params=PARAMS):
+        self.params = params
+        self.window = collections.deque()  # 由舊到新的 80 欄布林列, 最多保留 params.depth 期
+        self.history = collections.deque(maxlen=HISTORY_WINDOW)
+        self.co_occ = np.zeros((80, 80), dtype=np.int32)
+        self.long_freq = np.zeros(80, dtype=np.int64); self.short_heat = np.zeros(80, dtype=np.int64)
+        self.o_20 = 0; self.s_20 = 0
+        self.streaks = np.zeros(80, dtype=np.int64)
+        self.day_stats = {}  # date -> [奇數球, 小號球, 總球數]
+        self.last_no = None; self.last_item = None
+
+    def apply(self, item):
+        nums = parse_draw(item)
+        no = item.get('No')
+        self.last_no = no; self.last_item = item
+        if not nums: return
+        odd, small = self.push(draws_matrix([nums])[0])
+        self.history.appendleft({"no": no, "time": draw_time(item), "nums": nums})
+        stats = self.day_stats.setdefault(item.get('OpenDate', '')[:10], [0, 0, 0])
+        stats[0] += odd; stats[1] += small; stats[2] += 20
+
+    def push(self, row):
+        v = row.astype(np.int32)
+        self.window.append(row)
+        self.co_occ += np.outer(v, v)
+        self.long_freq += row; self.short_heat += row
+        odd, small = int(row[ODD_COLS].sum()), int(row[SMALL_COLS].sum())
+        self.o_20 += odd; self.s_20 += small
+        # 新一期進入後, 剛好落出各視窗的那一期扣回去
+        n_win = len(self.window); p = self.params
+        if n_win > p.long_window: self.long_freq -= self.window[-p.long_window - 1]
+        if n_win > p.short_window: self.short_heat -= self.window[-p.short_window - 1]
+        if n_win > p.ratio_window:
+            old = self.window[-p.ratio_window - 1]
+            self.o_20 -= int(old[ODD_COLS].sum()); self.s_20 -= int(old[SMALL_COLS].sum())
+        if n_win > p.co_occ_window:
+            old = self.window[-p.co_occ_window - 1].astype(np.int32)
+            self.co_occ -= np.outer(old, old)
+        if n_win > p.depth: self.window.popleft()
+        self.streaks = np.where(row, self.streaks + 1, 0)
+        return odd, small
+
+    def analysis(self):
+        e_20, b_20, status = ratio_status(self.o_20, self.s_20, self.params)
+        return score_numbers(self.long_freq, self.short_heat, self.streaks, status, self.params), status
+
+    def snapshot(self, target_date):
+        e_20, b_20, _ = ratio_status(self.o_20, self.s_20, self.params)
+        with metrics.span("score"): all_analysis, status = self.analysis()
+        p_day, s_day = day_ratio(*self.day_stats.get(target_date, [0, 0, 0]))
+        latest_win = list(self.history[0]["nums"]) if self.history else []
+        history = list(self.history)
+        with metrics.span("squads"):
+            generator = SquadGenerator(all_analysis, self.co_occ)
+            squads = {exclusive: build_squads(all_analysis, self.co_occ, exclusive, generator) for exclusive in (True, False)}
+        results = {}
+        for exclusive in (True, False):
+            results[exclusive] = (*squads[exclusive], p_day, s_day, f"{self.o_20}:{e_20}", f"{self.s_20}:{b_20}",
+                                  status, latest_win, self.last_no, draw_time(self.last_item), target_date, history)
+        return Snapshot(self.last_no, target_date, time.time(), results, generator, all_analysis)
+
+# --- 1.1.1 歷史區間批次分析 (連續多天共用同一份滑動視窗, 不必每天從頭算) ---
+
+MAX_RANGE_DAYS = 62
+
+def analyze_range(store, start, end):
+    first, last = datetime.date.fromisoformat(start), datetime.date.fromisoformat(end)
+    state = DrawState()
+    warmup = store.latest(ANALYSIS_DEPTH, until_date=(first - datetime.timedelta(days=1)).isoformat())
+    for item in reversed(warmup): state.apply(item)
+    snapshots = {}
+    day = first
+    while day <= last:
+        d = day.isoformat()
+        for item in reversed(store.by_date(d)): state.apply(item)
+        snapshots[d] = state.snapshot(d)
+        day += datetime.timedelta(days=1)
+    return snapshots
+
+async def get_range_analysis(start, end):
+    first, last = parse_date(start), parse_date(end)
+    if last < first or (last - first).days >= MAX_RANGE_DAYS:
+        raise HTTPException(status_code=422, detail=f"range must be 1-{MAX_RANGE_DAYS} days")
+    store = get_store()
+    days = [(first + datetime.timedelta(days=i)).isoformat() for i in range(-1, (last - first).days + 1)]
+    await ensure_archived(store, days)
+    return await asyncio.to_thread(analyze_range, store, first.isoformat(), last.isoformat())
+
+# --- 1.2 即時推播 (單一生產者: 每期只序列化一次, 扇出到所有連線的佇列) ---
+
+SSE_KEEPALIVE = 15
+SSE_QUEUE_SIZE = 8
+
+def draw_event(result):
+    (res_3star, res_4star, res_6star, p_day, s_day, p_20, s_20, status, latest_win, latest_no, latest_time, _, _) = result
+    data = json.dumps({"no": latest_no, "time": latest_time, "nums": latest_win, "p_day": p_day, "s_day": s_day, "p_20": p_20, "s_20": s_20,
+                       "status": status, "squads": {"3s": res_3star, "4s": res_4star, "6s": res_6star}}, separators=(",", ":"))
+    return f"event: draw\nid: {latest_no}\ndata: {data}\n\n".encode("utf-8")
+
+class Broadcaster:
+    def __init__(self):
+        self.clients = set()
+        self.last = None  # {exclusive: 已序列化的事件}
+
+    def subscribe(self):
+        q = asyncio.Queue(maxsize=SSE_QUEUE_SIZE)
+        self.clients.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        self.clients.discard(q)
+
+    def publish(self, snap, events=None):
+        self.last = events or {exclusive: draw_event(result) for exclusive, result in snap.results.items()}
+        for q in list(self.clients):
+            # 跟不上的慢連線丟掉最舊的一筆, 不讓它拖住其他人
+            if q.full(): q.get_nowait()
+            q.put_nowait(self.last)
+
+broadcaster = Broadcaster()
+
+# --- 1.3 背景輪詢 (只在出現新期號時增量更新並發布新快照) ---
+
+POLL_INTERVAL = 20
+POLL_ENABLED = os.environ.get("BINGO_POLL", "1") != "0"
+
+class DrawPoller:
+    def __init__(self, interval=POLL_INTERVAL):
+        self.interval = interval
+        self.state = DrawState()
+        self.snapshot = None
+        self._task = None
+
+    def _new_items(self, raw):
+        items = [item for item in raw if isinstance(item.get('No'), int)]
+        if self.state.last_no is not None: items = [item for item in items if item['No'] > self.state.last_no]
+        return sorted(items, key=lambda item: item['No'])
+
+    def _ingest(self, items, today):
+        with metrics.span("ingest"):
+            for item in items: self.state.apply(item)
+        # 整個快照重建後一次替換, 讀取端永遠拿到完整一致的物件
+        self.snapshot = self.state.snapshot(today)
+
+    async def poll_once(self):
+        now = datetime.datetime.now()
+        today = now.strftime("%Y-%m-%d")
+        store = get_store()
+        seed = []
+        if self.state.last_no is None:
+            # 啟動時先從本地資料庫接上歷史視窗, 不必重新下載
+            seed = await asyncio.to_thread(store.latest, ANALYSIS_DEPTH)
+            seed.reverse()
+        dates = [today]
+        last_date = (self.state.last_item or (seed[-1] if seed else {})).get('OpenDate', '')[:10]
+        if not last_date: dates.append((now - datetime.timedelta(days=1)).strftime("%Y-%m-%d"))
+        elif last_date != today: dates.append(last_date)  # 跨日時補抓前一天最後幾期
+        raws = await asyncio.gather(*(fetch_api(d) for d in dates))
+        for d, raw in zip(dates, raws):
+            if raw: draw_cache.put(d, raw); store.add_items(raw)
+        items = seed + self._new_items([item for raw in raws for item in raw if not seed or item.get('No', 0) > seed[-1]['No']])
+        if items or (self.snapshot and self.snapshot.date != today):
+            await asyncio.to_thread(self._ingest, items, today)
+            if items: broadcaster.publish(self.snapshot)
+            if shared is not None and shared.leader: await asyncio.to_thread(shared.publish, self.snapshot)
+        return len(items)
+
+    async def run(self):
+        while True:
+            try: await self.poll_once()
+            except Exception as e: print(f"[poller] {e!r}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None: self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try: await self._task
+            except asyncio.CancelledError: pass
+            self._task = None
+
+poller = DrawPoller()
+
+# --- 1.4 多 worker 共享快照 (檔案鎖選出一個領導者輪詢與分析, 其他 worker 以 mmap 直接讀它發布的結果) ---
+
+SHARED_PATH = os.environ.get("BINGO_SHARED")  # 設定後啟用; serve --workers N 會自動指定 (優先放在 /dev/shm)
+SHARED_POLL = 0.5
+SHARED_MAGIC = b"BINGOSNP"
+
+class LazySquadGenerator:
+    # 跟隨的 worker 只有 /api/squads 自訂組數時才需要排名表, 用到才建
+    def __init__(self, pool, co_occ):
+        self.pool = pool; self.co_occ = co_occ; self._gen = None
+
+    def generate(self, size, count, exclusive, cat_used=None):
+        if self._gen is None: self._gen = SquadGenerator(self.pool, self.co_occ)
+        return self._gen.generate(size, count, exclusive, cat_used)
+
+class SharedSnapshot:
+    # 檔案格式: MAGIC | 表頭長度 (uint32) | 表頭 JSON | 8 byte 對齊的區塊 (同開矩陣 / 預先壓縮好的頁面 / SSE 事件)
+    # 領導者寫完暫存檔再 os.replace, 讀取端拿到的永遠是完整的一份; 舊檔被取代後既有的 mmap 仍然有效
+    def __init__(self, path):
+        self.path = path
+        self.leader = False
+        self.loads = 0
+        self._lock_fd = None; self._ident = None; self._task = None
+
+    def try_lead(self):
+        if fcntl is None: self.leader = True; return True  # 沒有 flock 的平台: 每個行程各自輪詢
+        fd = os.open(self.path + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try: fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd); return False
+        self._lock_fd = fd; self.leader = True
+        return True
+
+    def publish(self, snap):
+        blobs, pages = [], {}
+        def add(data):
+            off = sum(len(b) for b in blobs)
+            blobs.append(bytes(data)); blobs.append(b"\0" * (-len(data) % 8))
+            return [off, len(data)]
+        # 只在領導者剛 ingest 完時呼叫, 此時輪詢狀態的同開矩陣就是這份快照用的
+        co_occ = add(poller.state.co_occ.astype(np.int32).tobytes())
+        for exclusive, result in snap.results.items():
+            key = (snap.latest_no, snap.date, exclusive)
+            page = page_cache.get(key) or page_cache.put(key, render_page(result, exclusive), snap.built_at)
+            pages[int(exclusive)] = {"etag": page["etag"], "last_modified": page["last_modified"], "modified": page["modified"],
+                                     "event": add(draw_event(result)), "bodies": {enc: add(page[enc]) for enc in ("identity", "gzip", "br") if enc in page}}
+        header = json.dumps({"latest_no": snap.latest_no, "date": snap.date, "built_at": snap.built_at, "scores": snap.scores, "co_occ": co_occ,
+                             "results": {int(ex): r for ex, r in snap.results.items()}, "pages": pages}, separators=(",", ":")).encode("utf-8")
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(SHARED_MAGIC); f.write(len(header).to_bytes(4, "little")); f.write(header); f.write(b"\0" * (-(12 + len(header)) % 8))
+            for b in blobs: f.write(b)
+        os.replace(tmp, self.path)
+
+    def load(self):
+        try: st = os.stat(self.path)
+        except FileNotFoundError: return None
+        if (st.st_ino, st.st_mtime_ns) == self._ident: return None
+        with open(self.path, "rb") as f: mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mm)
+        if view[:8] != SHARED_MAGIC: return None
+        n = int.from_bytes(view[8:12], "little")
+        header = json.loads(bytes(view[12:12 + n]))
+        base = 12 + n + (-(12 + n) % 8)
+        blob = lambda ref: view[base + ref[0]:base + ref[0] + ref[1]]
+        co_occ = np.frombuffer(blob(header["co_occ"]), dtype=np.int32).reshape(80, 80)
+        results = {bool(int(ex)): tuple(r) for ex, r in header["results"].items()}
+        snap = Snapshot(header["latest_no"], header["date"], header["built_at"], results, LazySquadGenerator(header["scores"], co_occ), header["scores"])
+        events = {}
+        for ex, meta in header["pages"].items():
+            exclusive = bool(int(ex))
+            # 頁面內容直接指向 mmap, 不複製; 頁面快取淘汰後才會釋放對應的映射
+            page_cache.add((snap.latest_no, snap.date, exclusive), {"etag": meta["etag"], "last_modified": meta["last_modified"], "modified": meta["modified"],
+                                                                   **{enc: blob(ref) for enc, ref in meta["bodies"].items()}})
+            events[exclusive] = bytes(blob(meta["event"]))
+        self._ident = (st.st_ino, st.st_mtime_ns); self.loads += 1
+        return snap, events
+
+    def follow(self):
+        loaded = self.load()
+        if loaded is None: return
+        snap, events = loaded
+        prev = poller.snapshot
+        poller.snapshot = snap
+        if prev is None or prev.latest_no != snap.latest_no: broadcaster.publish(snap, events)
+
+    async def run(self):
+        while True:
+            try:
+                # 領導者退出後鎖會釋放, 下一個搶到的 worker 接手輪詢
+                if not self.leader and self.try_lead(): poller.start()
+                if not self.leader: await asyncio.to_thread(self.follow)
+            except Exception as e: print(f"[shared] {e!r}")
+            if self.leader: return
+            await asyncio.sleep(SHARED_POLL)
+
+    def start(self):
+        if self._task is None: self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try: await self._task
+            except asyncio.CancelledError: pass
+            self._task = None
+        if self._lock_fd is not None:
+            os.close(self._lock_fd); self._lock_fd = None; self.leader = False
+
+shared = SharedSnapshot(SHARED_PATH) if SHARED_PATH else None
+
+# --- 2. 網頁前端 ---
+
+INDEX_TEMPLATE = """
+    <html class="dark">
+    <head>
+        <title>賓果量化 VIP</title>
+        <meta name="viewport" content="width=device-width, initial-scale=1, maximum-scale=1, user-scalable=0">
+        <script src="https://cdn.tailwindcss.com"></script>
+        <script>tailwind.config = { darkMode: 'class' }</script>
+        <style>
+            @import url('https://fonts.googleapis.com/css2?family=Noto+Sans+TC:wght@400;700;900&display=swap');
+            body { font-family: 'Noto Sans TC', sans-serif; transition: background-color 0.3s; -webkit-tap-highlight-color: transparent; }
+            .latest-ball { background: #f1f5f9; color: #475569; font-weight: 900; width: 34px; height: 34px; display: flex; align-items: center; justify-content: center; border-radius: 50%; font-size: 11px; border: 1px solid #e2e8f0; }
+            .dark .latest-ball { background: #1e293b; color: #94a3b8; border-color: #334155; }
+            .ball-hit { background-color: #fbbf24 !important; color: #000 !important; font-weight: 900; transform: scale(1.05); box-shadow: 0 0 10px rgba(251, 191, 36, 0.4); border: none !important; }
+
+            .badge-graphical { padding: 3px 8px; border-radius: 6px; font-size: 9px; font-weight: 900; display: inline-flex; align-items: center; justify-content: center; margin: 2px; }
+            .badge-3s { background: linear-gradient(135deg, #f59e0b 0%, #d97706 100%); color: white; }
+            .badge-4s { background: linear-gradient(135deg, #6366f1 0%, #4338ca 100%); color: white; }
+            .badge-6s { background: linear-gradient(135deg, #be123c 0%, #9f1239 100%); color: white; }
+            .badge-jackpot { background: linear-gradient(135deg, #fbbf24 0%, #f59e0b 100%); color: black !important; border: 1px solid #fff; animation: pulse-gold 1.5s infinite; }
+            
+            .matrix-jackpot { border: 2.5px solid #fbbf24 !important; box-shadow: 0 0 25px rgba(251, 191, 36, 0.6); animation: jackpot-blink 1s infinite alternate; background: rgba(251, 191, 36, 0.1) !important; }
+
+            @keyframes pulse-gold { 0% { transform: scale(1); } 50% { transform: scale(1.05); } 100% { transform: scale(1); } }
+            @keyframes jackpot-blink { from { border-color: #fbbf24; } to { border-color: #fff; transform: scale(1.02); } }
+
+            .streak-start-3s { border: 3px solid #a855f7 !important; position: relative; background: rgba(168, 85, 247, 0.05) !important; }
+            .streak-start-3s::after { content: '未命中起點'; position: absolute; top: -10px; right: 10px; background: #a855f7; color: white; font-size: 8px; padding: 1px 6px; border-radius: 4px; font-weight: 900; }
+
+            .dist-grid { display: grid; grid-template-columns: repeat(10, 1fr); gap: 3px; background: #fefce8; padding: 10px; border-radius: 16px; }
+            .dark .dist-grid { background: #0f172a; border: 1px solid #1e293b; }
+            .dist-ball { background: #ffffff; color: #64748b; font-weight: 900; font-size: 9px; height: 22px; display: flex; align-items: center; justify-content: center; border-radius: 6px; border: 1px solid #e2e8f0; }
+            .dark .dist-ball { background: #1e293b; color: #475569; border-color: #0f172a; }
+            
+            .active-3s { background: #f59e0b !important; color: white !important; border: none !important; }
+            .active-4s { background: #6366f1 !important; color: white !important; border: none !important; }
+            .active-6s { background: #be123c !important; color: white !important; border: none !important; }
+
+            .bt-miss-normal { background: #1e293b; color: #94a3b8; border: 1px solid #334155; }
+            .bt-miss-alert { background: #be123c; color: white; animation: pulse-red 1s infinite alternate; }
+            @keyframes pulse-red { from { opacity: 0.8; } to { opacity: 1; } }
+
+            .alert-jackpot-glow { animation: jackpot-blink 1s infinite alternate; border: 2px solid #fbbf24 !important; }
+
+            .profit-input { background: #f8fafc; border: 1px solid #e2e8f0; color: #1e293b; text-align: center; border-radius: 8px; font-weight: 900; width: 100%; height: 32px; font-size: 14px; }
+            .dark .profit-input { background: #0f172a; border-color: #334155; color: #f1f5f9; }
+        </style>
+    </head>
+    <body class="bg-slate-50 dark:bg-slate-950 text-slate-900 dark:text-slate-200 pb-20 text-[12px]">
+        <div class="max-w-6xl mx-auto p-4 md:p-8">
+            
+            <div class="flex justify-between items-center mb-8">
+                <h1 class="text-xl font-black italic uppercase dark:text-white tracking-tighter">賓果量化 <span class="text-rose-600 font-black">VIP</span></h1>
+                <button onclick="toggleDarkMode()" id="theme-btn" class="bg-slate-800 text-amber-400 px-4 py-2 rounded-xl font-black text-[10px] shadow-lg">🌙 主題切換</button>
+            </div>
+
+            <div class="grid grid-cols-1 md:grid-cols-2 gap-4 mb-8 text-white text-center italic font-black">
+                <div class="bg-indigo-700 p-6 rounded-[2rem] shadow-xl border-2 border-indigo-400">
+                    <p class="text-[10px] uppercase mb-4 tracking-widest underline underline-offset-4">奇偶動能分析</p>
+                    <div class="grid grid-cols-2 gap-4 border-t border-white/10 pt-4"><div><p class="text-[8px] opacity-60">今日累計</p><p class="text-lg" id="live-p-day">{{ p_day }}</p></div><div class="border-l border-white/10"><p class="text-[8px] text-amber-300 underline underline-offset-2">最近 20 期</p><p class="text-xl font-black text-amber-300" id="live-p-20">{{ p_20 }}</p></div></div>
+                </div>
+                <div class="bg-emerald-700 p-6 rounded-[2rem] shadow-xl border-2 border-emerald-400">
+                    <p class="text-[10px] uppercase mb-4 tracking-widest underline underline-offset-4">大小動能分析</p>
+                    <div class="grid grid-cols-2 gap-4 border-t border-white/10 pt-4"><div><p class="text-[8px] opacity-60">今日累計</p><p class="text-lg" id="live-s-day">{{ s_day }}</p></div><div class="border-l border-white/10"><p class="text-[8px] text-amber-300 underline underline-offset-2">最近 20 期</p><p class="text-xl font-black text-amber-300" id="live-s-20">{{ s_20 }}</p></div></div>
+                </div>
+            </div>
+
+            <div class="grid grid-cols-1 lg:grid-cols-4 gap-6 mb-10 text-center font-black">
+                <div class="lg:col-span-3 bg-white dark:bg-slate-900 p-6 rounded-3xl shadow-sm border border-slate-100 dark:border-slate-800 italic">
+                    <div class="flex justify-between items-center mb-6 border-b pb-4 text-slate-400 font-black">
+                        <h3 class="text-xs uppercase tracking-widest">📢 最新期號: <span class="text-indigo-600 dark:text-indigo-400 font-mono" id="live-no">{{ latest_no }} ({{ latest_time }})</span></h3>
+                        <button onclick="location.reload()" class="bg-indigo-500 text-white px-5 py-2 rounded-xl text-[10px] shadow-lg">刷新數據</button>
+                    </div>
+                    <div class="space-y-6 text-center">
+                        <div class="bg-rose-50 dark:bg-rose-950/20 p-5 rounded-[2.5rem] border-2 border-rose-100 dark:border-rose-900/30">
+                            <p class="text-[10px] font-black text-rose-500 mb-4 uppercase tracking-[0.4em] underline underline-offset-8 italic">🔥 VIP 核心狙擊</p>
+                            <div class="flex justify-center items-center gap-3" id="live-vip">
+                                {% set vip = res_6star[0].picks if res_6star else [] %}
+                                {% for n in vip %}<div class="latest-ball" style="background:#be123c; color:white; border:none; width:36px; height:36px;">{{ "%02d" | format(n) }}</div>{% endfor %}
+                                <button onclick='quickFill("6s", 1, {{ vip | tojson }})' class="ml-4 bg-rose-600 text-white px-6 py-2.5 rounded-2xl text-[10px] font-black shadow-xl">裝載 V1</button>
+                            </div>
+                        </div>
+                        <div class="flex flex-wrap gap-2.5 justify-center" id="live-win">{% for n in latest_win %}<div class="latest-ball ball-all" data-val="{{ n }}">{{ "%02d" | format(n) }}</div>{% endfor %}</div>
+                    </div>
+                </div>
+                <div class="bg-slate-900 p-5 rounded-3xl shadow-xl border-4 border-slate-800 text-white font-black italic">
+                    <h4 class="text-center text-[9px] font-black text-indigo-400 uppercase mb-4 underline underline-offset-4">即時中獎監控</h4>
+                    <div class="space-y-3">
+                        <div id="card-3s" class="bg-slate-800/50 p-2 rounded-2xl border border-slate-700 transition-all"><p class="text-[7px] text-amber-500 mb-1.5 uppercase font-black">3-Star (未命中: <span id="bt-count-3s-live">0</span>)</p><div class="grid grid-cols-2 gap-2 text-center"><div class="stat-card"><p class="text-[5px] text-slate-400">中2</p><p class="text-lg" id="count-3s-2">0</p></div><div class="stat-card"><p class="text-[5px] text-slate-400">全中</p><p class="text-lg text-amber-400" id="count-3s-3">0</p></div></div></div>
+                        <div id="card-4s" class="bg-slate-800/50 p-2 rounded-2xl border border-slate-700 transition-all"><p class="text-[7px] text-indigo-400 mb-1.5 uppercase font-black">4-Star (未命中: <span id="bt-count-4s-live">0</span>)</p><div class="grid grid-cols-3 gap-1 text-center"><div class="stat-card"><p class="text-[5px] text-slate-400">中2</p><p class="text-md" id="count-4s-2">0</p></div><div class="stat-card"><p class="text-[5px] text-slate-400">中3</p><p class="text-md" id="count-4s-3">0</p></div><div class="stat-card"><p class="text-[5px] text-slate-400">全中</p><p class="text-md text-indigo-400" id="count-4s-4">0</p></div></div></div>
+                        <div id="card-6s" class="bg-slate-800/50 p-2 rounded-2xl border border-slate-700 transition-all"><p class="text-[7px] text-rose-500 mb-1.5 uppercase font-black">VIP 6-Star (未命中: <span id="bt-count-6s-live">0</span>)</p><div class="grid grid-cols-4 gap-0.5 text-center font-black"><div class="stat-card"><p class="text-[4px] text-slate-400">中3</p><p class="text-[10px]" id="count-6s-3">0</p></div><div class="stat-card"><p class="text-[4px] text-slate-400">中4</p><p class="text-[10px]" id="count-6s-4">0</p></div><div class="stat-card"><p class="text-[4px] text-slate-400">中5</p><p class="text-[10px]" id="count-6s-5">0</p></div><div class="stat-card"><p class="text-[4px] text-slate-400">全中</p><p class="text-[10px] text-rose-400" id="count-6s-6">0</p></div></div></div>
+                    </div>
+                </div>
+            </div>
+
+            <div class="bg-white dark:bg-slate-900 p-6 rounded-[3rem] shadow-xl border border-slate-200 dark:border-slate-800 mb-6 italic">
+                <div class="grid grid-cols-1 md:grid-cols-4 gap-4 font-black">
+                    <div class="space-y-2 text-center border-r dark:border-slate-800 pr-4">
+                        <label class="text-[8px] text-slate-400 uppercase">倍數 / 組數</label>
+                        <div class="flex gap-2"><input type="number" id="in-multiplier" class="profit-input" value="1" oninput="calculateProfit()"><input type="number" id="in-sets" class="profit-input" value="10" oninput="calculateProfit()"></div>
+                        <button onclick="postToDailyJournal()" class="w-full mt-2 bg-emerald-600 text-white py-2 rounded-xl text-[10px] font-black uppercase">存入日誌</button>
+                    </div>
+                    <div class="space-y-2 px-2 text-center border-r dark:border-slate-800">
+                        <p class="text-[9px] text-amber-500 uppercase border-b">三星命中</p>
+                        <div class="grid grid-cols-2 gap-2 mt-2"><input type="number" id="in-3h2" class="profit-input" placeholder="中2" oninput="calculateProfit()"><input type="number" id="in-3h3" class="profit-input" placeholder="全中" oninput="calculateProfit()"></div>
+                    </div>
+                    <div class="space-y-2 px-2 text-center border-r dark:border-slate-800">
+                        <p class="text-[9px] text-indigo-500 uppercase border-b">四星命中</p>
+                        <div class="grid grid-cols-3 gap-1 mt-2"><input type="number" id="in-4h2" class="profit-input" placeholder="2" oninput="calculateProfit()"><input type="number" id="in-4h3" class="profit-input" placeholder="3" oninput="calculateProfit()"><input type="number" id="in-4h4" class="profit-input" placeholder="全" oninput="calculateProfit()"></div>
+                    </div>
+                    <div class="space-y-2 px-2 text-center">
+                        <p class="text-[9px] text-rose-500 uppercase border-b">六星命中</p>
+                        <div class="grid grid-cols-2 gap-1 mt-2"><input type="number" id="in-6h4" class="profit-input" placeholder="中4" oninput="calculateProfit()"><input type="number" id="in-6h6" class="profit-input" placeholder="全中" oninput="calculateProfit()"></div>
+                    </div>
+                </div>
+                <div class="grid grid-cols-3 gap-4 mt-6 text-center bg-slate-50 dark:bg-slate-950 p-4 rounded-2xl border dark:border-slate-800 font-black">
+                    <div><p class="text-[8px] text-slate-400 uppercase">成本</p><p class="text-lg text-rose-500" id="display-total-cost">-$ 0</p></div>
+                    <div><p class="text-[8px] text-slate-400 uppercase">獎金</p><p class="text-lg text-indigo-400" id="display-total-prize">+$ 0</p></div>
+                    <div class="border-l dark:border-slate-800"><p class="text-[8px] text-indigo-600 uppercase">預估淨利</p><p class="text-lg text-emerald-400" id="display-net-profit">$ 0</p></div>
+                </div>
+            </div>
+
+            <div class="bg-emerald-900 p-8 rounded-[3rem] shadow-2xl text-white mb-6 border-4 border-emerald-800 italic">
+                <div class="flex justify-between items-center mb-6">
+                    <h3 class="text-[11px] font-black uppercase tracking-[0.3em]">今日實戰累積日誌</h3>
+                    <button onclick="resetDailyJournal()" class="text-[8px] bg-red-900 px-4 py-1.5 rounded-full uppercase">清空日誌</button>
+                </div>
+                <div class="grid grid-cols-1 md:grid-cols-3 gap-6 text-center font-black">
+                    <div class="bg-black/20 p-5 rounded-3xl border border-white/5"><p class="text-[9px] text-emerald-300 mb-1">今日成本</p><p class="text-2xl font-mono" id="day-total-cost">$ 0</p></div>
+                    <div class="bg-black/20 p-5 rounded-3xl border border-white/5"><p class="text-[9px] text-emerald-300 mb-1">今日獎金</p><p class="text-2xl font-mono" id="day-total-prize">$ 0</p></div>
+                    <div class="bg-emerald-500 text-emerald-950 p-5 rounded-3xl shadow-lg border-2 border-emerald-400 font-black"><p class="text-[9px] uppercase mb-1">今日純利</p><p class="text-3xl font-mono" id="day-net-profit">$ 0</p></div>
+                </div>
+            </div>
+
+            <div class="grid grid-cols-1 md:grid-cols-3 gap-4 mb-6 text-center italic font-black uppercase">
+                <div class="bg-white dark:bg-slate-900 p-4 rounded-3xl border dark:border-slate-800"><h3 class="text-[8px] text-amber-600 mb-3 underline">📡 三星分佈</h3><div class="dist-grid" id="dist-grid-3s">{% for i in range(1, 81) %}<div class="dist-ball" id="dist3s-{{i}}">{{ "%02d" | format(i) }}</div>{% endfor %}</div></div>
+                <div class="bg-white dark:bg-slate-900 p-4 rounded-3xl border dark:border-slate-800"><h3 class="text-[8px] text-indigo-600 mb-3 underline">📡 四星分佈</h3><div class="dist-grid" id="dist-grid-4s">{% for i in range(1, 81) %}<div class="dist-ball" id="dist4s-{{i}}">{{ "%02d" | format(i) }}</div>{% endfor %}</div></div>
+                <div class="bg-white dark:bg-slate-900 p-4 rounded-3xl border dark:border-slate-800"><h3 class="text-[8px] text-rose-600 mb-3 underline">📡 六星狙擊</h3><div class="dist-grid" id="dist-grid-6s">{% for i in range(1, 81) %}<div class="dist-ball" id="dist6s-{{i}}">{{ "%02d" | format(i) }}</div>{% endfor %}</div></div>
+            </div>
+
+            <div class="space-y-6 mb-10">
+                <div class="bg-slate-900 p-6 rounded-[3rem] shadow-2xl border-4 border-slate-800 text-white font-black">
+                    <div class="flex justify-between items-center mb-4 px-2 text-amber-400"><h3 class="text-[10px]">三星矩陣庫</h3><div class="flex gap-2"><button onclick="loadAll('3s')" class="bg-green-700 px-3 py-1 rounded text-[8px]">裝載</button><button onclick="clearMatrix('3s')" class="bg-red-900 px-3 py-1 rounded text-[8px]">清除</button></div></div>
+                    <div class="grid grid-cols-2 md:grid-cols-5 gap-3">
+                        {% for i in range(1, 11) %}
+                        <div id="set-3s-{{i}}" class="bg-slate-800/50 p-2 rounded-xl text-center border border-transparent">
+                            <div class="flex justify-between items-center mb-1 px-1">
+                                <span class="text-[7px] text-slate-500 uppercase">SET {{ i }}</span>
+                                <span class="text-[7px] bg-black/40 px-1.5 py-0.5 rounded-full text-slate-400 font-black" id="jack-stat-3s-{{i}}">🏆 100期: 0</span>
+                            </div>
+                            <div class="flex gap-1">{% for j in range(1, 4) %}<input type="text" id="3s-g{{i}}n{{j}}" class="w-full h-8 text-center text-sm font-black bg-slate-900 rounded border border-slate-600 text-white" oninput="saveAndCompare()">{% endfor %}</div>
+                        </div>
+                        {% endfor %}
+                    </div>
+                </div>
+                <div class="bg-slate-900 p-6 rounded-[3rem] shadow-2xl border-4 border-slate-800 text-white font-black">
+                    <div class="flex justify-between items-center mb-4 px-2 text-indigo-400"><h3 class="text-[10px]">四星矩陣庫</h3><div class="flex gap-2"><button onclick="loadAll('4s')" class="bg-indigo-700 px-3 py-1 rounded text-[8px]">裝載</button><button onclick="clearMatrix('4s')" class="bg-red-900 px-3 py-1 rounded text-[8px]">清除</button></div></div>
+                    <div class="grid grid-cols-2 md:grid-cols-5 gap-3">
+                        {% for i in range(1, 11) %}
+                        <div id="set-4s-{{i}}" class="bg-slate-800/50 p-2 rounded-xl text-center border border-transparent">
+                            <div class="flex justify-between items-center mb-1 px-1">
+                                <span class="text-[7px] text-indigo-300 uppercase">S{{ i }}</span>
+                                <span class="text-[7px] bg-black/40 px-1.5 py-0.5 rounded-full text-slate-400 font-black" id="jack-stat-4s-{{i}}">🏆 100期: 0</span>
+                            </div>
+                            <div class="flex gap-1">{% for j in range(1, 5) %}<input type="text" id="4s-g{{i}}n{{j}}" class="w-full h-8 text-center text-xs font-black bg-slate-900 rounded border border-slate-600 text-white" oninput="saveAndCompare()">{% endfor %}</div>
+                        </div>
+                        {% endfor %}
+                    </div>
+                </div>
+                
+                <div class="bg-slate-900 p-8 rounded-[3rem] shadow-2xl border-4 border-slate-800 text-white">
+                    <div class="flex justify-between items-center mb-6 px-2 text-rose-400 uppercase underline underline-offset-8 tracking-widest font-black"><h3 class="text-[10px]">VIP 六星狙擊中心 (10 組)</h3><div class="flex gap-2"><button onclick="loadAll('6s')" class="bg-rose-700 px-4 py-1 rounded text-[8px]">裝載 VIP</button><button onclick="clearMatrix('6s')" class="bg-red-900 px-4 py-1 rounded text-[8px]">清除</button></div></div>
+                    <div class="grid grid-cols-1 md:grid-cols-5 gap-4 font-black">
+                        {% for i in range(1, 11) %}
+                        <div id="set-6s-{{i}}" class="bg-slate-800/50 p-3 rounded-2xl text-center border border-transparent relative overflow-hidden transition-all shadow-inner">
+                            <div class="flex justify-between items-center mb-2 px-1">
+                                <span class="text-[7px] text-rose-400">VIP {{ i }}</span>
+                                <span class="text-[7px] bg-black/40 px-1.5 py-0.5 rounded-full text-slate-400 font-black" id="jack-stat-6s-{{i}}">🏆 100期: 0</span>
+                            </div>
+                            <div class="grid grid-cols-3 gap-1">{% for j in range(1, 7) %}<input type="text" id="6s-g{{i}}n{{j}}" class="w-full h-8 text-center text-[11px] font-black bg-slate-950 rounded border border-slate-700 text-rose-500 outline-none" oninput="saveAndCompare()">{% endfor %}</div>
+                        </div>
+                        {% endfor %}
+                    </div>
+                </div>
+            </div>
+
+            <div class="mb-20">
+                <div class="flex flex-col md:flex-row justify-between items-center mb-6 px-2 border-b dark:border-slate-800 pb-4 font-black uppercase italic gap-4">
+                    <h2 class="text-sm dark:text-white border-l-4 border-indigo-500 pl-3">🚀 量化策略庫房</h2>
+                    <div class="flex items-center gap-3">
+                        <span class="text-[10px] font-black text-slate-500">佈陣邏輯：</span>
+                        <div class="inline-flex rounded-xl bg-slate-100 dark:bg-slate-800 p-1 shadow-inner border dark:border-slate-700">
+                            <button onclick="setExclusive(false)" class="px-4 py-1.5 rounded-lg text-[10px] font-black transition-all {% if not exclusive %}bg-white dark:bg-slate-600 text-indigo-600 dark:text-white shadow-sm{% else %}text-slate-400 opacity-60{% endif %}">精準集中模式</button>
+                            <button onclick="setExclusive(true)" class="px-4 py-1.5 rounded-lg text-[10px] font-black transition-all {% if exclusive %}bg-indigo-600 text-white shadow-md{% else %}text-slate-400 opacity-60{% endif %}">全域覆蓋策略</button>
+                        </div>
+                    </div>
+                </div>
+
+                <div class="grid grid-cols-2 md:grid-cols-5 gap-4 mb-10 text-[10px] uppercase font-black text-center" id="squad-cards">
+                    {% for sq in res_3star %}<div class="bg-white dark:bg-slate-900 p-3 rounded-2xl shadow-sm border dark:border-slate-800">G{{ sq.id }} (3S)<div class="flex justify-center gap-1 my-2">{% for n in sq.picks %}<span class="bg-slate-900 text-white px-1.5 rounded">{{ "%02d" | format(n) }}</span>{% endfor %}</div><button onclick='quickFill("3s", {{ sq.id }}, {{ sq.picks | tojson }})' class="w-full bg-amber-50 dark:bg-amber-900/20 text-amber-600 py-1 rounded font-black italic shadow-sm uppercase">裝載</button></div>{% endfor %}
+                    {% for sq in res_4star %}<div class="bg-white dark:bg-slate-900 p-3 rounded-2xl shadow-sm border dark:border-slate-800">S{{ sq.id }} (4S)<div class="flex justify-center gap-1 my-2">{% for n in sq.picks %}<span class="bg-indigo-900 text-white px-1.5 rounded">{{ "%02d" | format(n) }}</span>{% endfor %}</div><button onclick='quickFill("4s", {{ sq.id }}, {{ sq.picks | tojson }})' class="w-full bg-indigo-50 dark:bg-indigo-900/20 text-indigo-600 py-1 rounded font-black italic shadow-sm uppercase">裝載</button></div>{% endfor %}
+                    {% for sq in res_6star %}<div class="bg-white dark:bg-slate-900 p-3 rounded-2xl shadow-sm border dark:border-slate-800">V{{ sq.id }} (6S)<div class="flex justify-center gap-0.5 my-2">{% for n in sq.picks %}<span class="bg-rose-900 text-white px-1 rounded text-[8px]">{{ "%02d" | format(n) }}</span>{% endfor %}</div><button onclick='quickFill("6s", {{ sq.id }}, {{ sq.picks | tojson }})' class="w-full bg-rose-50 dark:bg-rose-900/20 text-rose-600 py-1 rounded font-black italic shadow-sm uppercase">裝載</button></div>{% endfor %}
+                </div>
+
+                <div class="bg-white dark:bg-slate-900 p-8 rounded-[3.5rem] shadow-xl border border-slate-200 dark:border-slate-800 text-[10px] font-black italic">
+                    <div class="flex flex-col md:flex-row justify-between items-center mb-6 border-b dark:border-slate-800 pb-4 gap-4 uppercase font-black">
+                        <h3 class="text-sm text-slate-800 dark:text-slate-200 underline underline-offset-8">🕰️ 歷史 100 期實戰戰果分析</h3>
+                        <div class="flex gap-3 font-black">
+                            <div id="bt-box-3s" class="bt-miss-normal px-4 py-1.5 rounded-xl text-[9px]">三星未中: <span id="bt-count-3s">0</span></div>
+                            <div id="bt-box-4s" class="bt-miss-normal px-4 py-1.5 rounded-xl text-[9px]">四星未中: <span id="bt-count-4s">0</span></div>
+                            <div id="bt-box-6s" class="bt-miss-normal px-4 py-1.5 rounded-xl text-[9px]">六星未中: <span id="bt-count-6s">0</span></div>
+                        </div>
+                    </div>
+                    <div id="backtest-body" class="space-y-4 font-mono uppercase italic font-black"></div>
+                </div>
+            </div>
+        </div>
+
+        <script>
+            let server3S = {{ res_3star | tojson }}; let server4S = {{ res_4star | tojson }};
+            let server6S = {{ res_6star | tojson }};
+            const recentHistory = {{ recent_history | tojson }}; let winNums = {{ latest_win | tojson }};
+            const liveExclusive = {{ exclusive | tojson }};
+
+            function toggleDarkMode() { const isDark = document.documentElement.classList.toggle('dark'); localStorage.setItem('bingo_v121_dark', isDark); updateThemeUI(isDark); }
+            function updateThemeUI(isDark) { document.getElementById('theme-btn').innerText = isDark ? '☀️ 亮色模式' : '🌙 深色切換'; }
+            function setExclusive(val) { window.location.href = `/?exclusive=${val}`; }
+
+            function clearMatrix(t) { const sz = (t === '3s') ? 3 : (t === '4s' ? 4 : 6); for(let i=1; i<=10; i++) { for(let j=1; j<=sz; j++) { const el = document.getElementById(`${t}-g${i}n${j}`); if(el) el.value = ""; } } saveAndCompare(); }
+            function loadAll(t) { const pool = (t==='3s'?server3S:(t==='4s'?server4S:server6S)); pool.forEach(sq => { sq.picks.forEach((n, idx) => { const el = document.getElementById(`${t}-g${sq.id}n${idx+1}`); if(el) el.value = n.toString().padStart(2, '0'); }); }); saveAndCompare(); }
+            function quickFill(t, id, ns) { ns.forEach((n, j) => { const el = document.getElementById(`${t}-g${id}n${j+1}`); if(el) el.value = n.toString().padStart(2, '0'); }); saveAndCompare(); }
+
+            function calculateProfit() {
+                const multi = parseInt(document.getElementById('in-multiplier').value) || 1;
+                const sets = parseInt(document.getElementById('in-sets').value) || 10;
+                const cost = sets * multi * 25;
+                const prize = ((parseInt(document.getElementById('in-3h2').value)||0)*50 + (parseInt(document.getElementById('in-3h3').value)||0)*1000 + (parseInt(document.getElementById('in-4h2').value)||0)*25 + (parseInt(document.getElementById('in-4h3').value)||0)*150 + (parseInt(document.getElementById('in-4h4').value)||0)*2000 + (parseInt(document.getElementById('in-6h4').value)||0)*200 + (parseInt(document.getElementById('in-6h6').value)||0)*50000) * multi;
+                const net = prize - cost;
+                document.getElementById('display-total-cost').innerText = "-$ " + cost.toLocaleString();
+                document.getElementById('display-total-prize').innerText = "+$ " + prize.toLocaleString();
+                const nd = document.getElementById('display-net-profit'); nd.innerText = (net >= 0 ? "+$ " : "-$ ") + Math.abs(net).toLocaleString();
+                nd.className = net >= 0 ? "text-lg font-black text-emerald-400" : "text-lg font-black text-rose-500";
+                runBacktest(); 
+            }
+
+            function resetDailyJournal() { if(confirm("確定重置數據？")) { localStorage.setItem('bingo_journal_v121', '{"cost":0, "prize":0}'); updateJournalDisplay(); } }
+
+            const BT_BADGES = {
+                '3s': {2: '<span class="badge-graphical badge-3s">3中2</span>', 3: '<span class="badge-graphical badge-jackpot">🏆 3中3</span>'},
+                '4s': {2: '<span class="badge-graphical badge-4s opacity-60">4中2</span>', 3: '<span class="badge-graphical badge-4s">4中3</span>', 4: '<span class="badge-graphical badge-jackpot">🏆 4中4</span>'},
+                '6s': {3: '<span class="badge-graphical badge-6s">6中3</span>', 4: '<span class="badge-graphical badge-6s">6中4</span>', 5: '<span class="badge-graphical badge-6s">6中5</span>', 6: '<span class="badge-graphical badge-jackpot">🏆 6星全中</span>'}
+            };
+            const JACK_STAT_ON = { '3s': "bg-amber-500 text-black", '4s': "bg-indigo-500 text-white", '6s': "bg-rose-500 text-white" };
+            let btSeq = 0;
+
+            async function runBacktest() {
+                const multi = parseInt(document.getElementById('in-multiplier').value) || 1;
+                const sets = [];
+                [['3s', 3], ['4s', 4], ['6s', 6]].forEach(([t, sz]) => {
+                    for(let i=1; i<=10; i++) {
+                        const sq = [...Array(sz).keys()].map(j => Number(document.getElementById(`${t}-g${i}n${j+1}`).value)).filter(n => n>0);
+                        if(sq.length === sz) sets.push({ t: t, i: i, picks: sq });
+                    }
+                });
+
+                // 命中計算交給伺服器 (/api/backtest), 這裡只負責畫面; 連續輸入時只採用最後一次請求的結果
+                const seq = ++btSeq;
+                let res;
+                try {
+                    const resp = await fetch('/api/backtest', { method: 'POST', headers: { 'Content-Type': 'application/json' },
+                        body: JSON.stringify({ squads: sets.map(s => s.picks), window: recentHistory.length || 100, multiplier: multi, until_no: recentHistory.length ? recentHistory[0].no : null }) });
+                    if(!resp.ok) return;
+                    res = await resp.json();
+                } catch(e) { return; }
+                if(seq !== btSeq) return;
+
+                const picked = new Set(sets.flatMap(s => s.picks));
+                let html = "";
+                res.draws.forEach((draw) => {
+                    const details = [];
+                    draw.hits.forEach((h, k) => { const b = BT_BADGES[sets[k].t][h]; if(b) details.push(b); });
+                    const finalP = draw.prize;
+                    const isStart3s = (draw.no === res.start_no_3s);
+                    let cardHtml = `<div class="p-4 rounded-[2rem] border transition-all ${isStart3s ? 'streak-start-3s' : 'bg-slate-50 dark:bg-slate-800/40 border-slate-100 dark:border-slate-800'}"><div class="flex justify-between items-center mb-3"><span class="text-[12px] font-black text-indigo-600 dark:text-indigo-400"># ${draw.no}</span><span class="text-[9px] opacity-40 font-mono italic underline underline-offset-4">${draw.time}</span></div><div class="flex flex-wrap gap-1.5 mb-3">`;
+                    draw.nums.forEach(n => { const hit = picked.has(n); cardHtml += `<span class="w-6 h-6 flex items-center justify-center text-[10px] rounded-full ${hit ? 'ball-hit scale-105' : 'bg-white dark:bg-slate-900 text-slate-300 dark:text-slate-600 border border-slate-100 dark:border-slate-800'}">${n.toString().padStart(2,'0')}</span>`; });
+                    cardHtml += `</div><div class="flex justify-between items-center border-t dark:border-slate-700/50 pt-3"><div class="flex flex-wrap gap-1">${details.join('')}</div><div class="text-right"><span class="text-[12px] font-black ${finalP>0?'text-emerald-500':'text-slate-400 opacity-20'}">$ ${finalP.toLocaleString()}</span></div></div></div>`;
+                    html += cardHtml;
+                });
+                document.getElementById('backtest-body').innerHTML = html;
+
+                // 每組 100 期全中次數
+                sets.forEach((s, k) => {
+                    const el = document.getElementById(`jack-stat-${s.t}-${s.i}`); if(!el) return;
+                    const hj = res.squads[k].jackpots;
+                    el.innerText = `🏆 100期: ${hj}`;
+                    el.className = hj > 0 ? `text-[7px] ${JACK_STAT_ON[s.t]} px-1.5 py-0.5 rounded-full font-black scale-110` : "text-[7px] bg-black/40 px-1.5 py-0.5 rounded-full text-slate-400";
+                });
+
+                const m3 = res.miss['3'], m4 = res.miss['4'], m6 = res.miss['6'];
+                document.getElementById('bt-count-3s').innerText = m3; document.getElementById('bt-count-4s').innerText = m4; document.getElementById('bt-count-6s').innerText = m6;
+                document.getElementById('bt-count-3s-live').innerText = m3; document.getElementById('bt-count-4s-live').innerText = m4; document.getElementById('bt-count-6s-live').innerText = m6;
+                const alertClass = (count) => count >= 15 ? "bt-miss-alert px-4 py-1.5 rounded-xl text-[9px] font-black" : "bt-miss-normal px-4 py-1.5 rounded-xl text-[9px] font-black";
+                document.getElementById('bt-box-3s').className = alertClass(m3); document.getElementById('bt-box-4s').className = alertClass(m4); document.getElementById('bt-box-6s').className = alertClass(m6);
+            }
+
+            function saveAndCompare() {
+                const d = { s3: {}, s4: {}, s6: {} };
+                for(let i=1; i<=10; i++) { 
+                    d.s3[i] = [1,2,3].map(j => document.getElementById(`3s-g${i}n${j}`).value); 
+                    d.s4[i] = [1,2,3,4].map(j => document.getElementById(`4s-g${i}n${j}`).value);
+                    d.s6[i] = [1,2,3,4,5,6].map(j => document.getElementById(`6s-g${i}n${j}`).value);
+                }
+                localStorage.setItem('bingo_v121_matrix', JSON.stringify(d)); executeComparison();
+            }
+
+            function executeComparison() {
+                document.querySelectorAll('.ball-all').forEach(el => { for(let i=1; i<=10; i++) el.classList.remove(`hit-g${i}`); });
+                document.querySelectorAll('.dist-ball').forEach(el => el.classList.remove('active-3s', 'active-4s', 'active-6s'));
+                for(let i=1; i<=10; i++) {
+                    document.getElementById(`set-3s-${i}`)?.classList.remove('matrix-jackpot');
+                    document.getElementById(`set-4s-${i}`)?.classList.remove('matrix-jackpot');
+                    document.getElementById(`set-6s-${i}`)?.classList.remove('matrix-jackpot');
+                }
+
+                let st = { s3_2: 0, s3_3: 0, s4_2: 0, s4_3: 0, s4_4: 0, s6_3:0, s6_4:0, s6_5:0, s6_6:0 }; 
+                for(let i=1; i<=10; i++) {
+                    const sq3 = [1,2,3].map(j => Number(document.getElementById(`3s-g${i}n${j}`).value)).filter(n => n > 0);
+                    let h3 = 0; sq3.forEach(n => { document.getElementById(`dist3s-${n}`)?.classList.add('active-3s'); if(winNums.includes(n)) h3++; });
+                    if(h3 === 3 && sq3.length === 3) { st.s3_3++; document.getElementById(`set-3s-${i}`).classList.add('matrix-jackpot'); }
+                    else if(h3 === 2) st.s3_2++;
+
+                    const sq4 = [1,2,3,4].map(j => Number(document.getElementById(`4s-g${i}n${j}`).value)).filter(n => n > 0);
+                    let h4 = 0; sq4.forEach(n => { document.getElementById(`dist4s-${n}`)?.classList.add('active-4s'); if(winNums.includes(n)) h4++; });
+                    if(h4 === 4 && sq4.length === 4) { st.s4_4++; document.getElementById(`set-4s-${i}`).classList.add('matrix-jackpot'); }
+                    else if(h4 === 3) st.s4_3++; else if(h4 === 2) st.s4_2++;
+
+                    const sq6 = [1,2,3,4,5,6].map(j => Number(document.getElementById(`6s-g${i}n${j}`).value)).filter(n => n > 0);
+                    let h6 = 0; sq6.forEach(n => { document.getElementById(`dist6s-${n}`)?.classList.add('active-6s'); if(winNums.includes(n)) h6++; });
+                    if(h6 === 6 && sq6.length === 6) { st.s6_6++; document.getElementById(`set-6s-${i}`).classList.add('matrix-jackpot'); }
+                    else if(h6 === 5) st.s6_5++; else if(h6 === 4) st.s6_4++; else if(h6 === 3) st.s6_3++;
+                }
+
+                document.getElementById('count-3s-2').innerText = st.s3_2; document.getElementById('count-3s-3').innerText = st.s3_3;
+                document.getElementById('count-4s-2').innerText = st.s4_2; document.getElementById('count-4s-3').innerText = st.s4_3; document.getElementById('count-4s-4').innerText = st.s4_4;
+                document.getElementById('count-6s-3').innerText = st.s6_3; document.getElementById('count-6s-4').innerText = st.s6_4;
+                document.getElementById('count-6s-5').innerText = st.s6_5; document.getElementById('count-6s-6').innerText = st.s6_6;
+                
+                const c3 = document.getElementById('card-3s'); if(st.s3_3 > 0) c3.classList.add('alert-jackpot-glow'); else c3.classList.remove('alert-jackpot-glow');
+                const c4 = document.getElementById('card-4s'); if(st.s4_4 > 0) c4.classList.add('alert-jackpot-glow'); else c4.classList.remove('alert-jackpot-glow');
+                const c6 = document.getElementById('card-6s'); if(st.s6_6 > 0) c6.classList.add('alert-jackpot-glow'); else c6.classList.remove('alert-jackpot-glow');
+                
+                calculateProfit();
+            }
+
+            // 即時推播: 新一期開出時伺服器經 /stream 推送差異, 不必重新載入整頁
+            const SQUAD_CARD = {
+                '3s': ['G', '3S', 'gap-1', 'bg-slate-900 text-white px-1.5 rounded', 'bg-amber-50 dark:bg-amber-900/20 text-amber-600'],
+                '4s': ['S', '4S', 'gap-1', 'bg-indigo-900 text-white px-1.5 rounded', 'bg-indigo-50 dark:bg-indigo-900/20 text-indigo-600'],
+                '6s': ['V', '6S', 'gap-0.5', 'bg-rose-900 text-white px-1 rounded text-[8px]', 'bg-rose-50 dark:bg-rose-900/20 text-rose-600']
+            };
+            const pad2 = (n) => n.toString().padStart(2, '0');
+
+            function renderSquadCards() {
+                let html = "";
+                [['3s', server3S], ['4s', server4S], ['6s', server6S]].forEach(([t, pool]) => {
+                    const [prefix, label, gap, ball, btn] = SQUAD_CARD[t];
+                    pool.forEach(sq => { html += `<div class="bg-white dark:bg-slate-900 p-3 rounded-2xl shadow-sm border dark:border-slate-800">${prefix}${sq.id} (${label})<div class="flex justify-center ${gap} my-2">${sq.picks.map(n => `<span class="${ball}">${pad2(n)}</span>`).join('')}</div><button onclick='quickFill("${t}", ${sq.id}, ${JSON.stringify(sq.picks)})' class="w-full ${btn} py-1 rounded font-black italic shadow-sm uppercase">裝載</button></div>`; });
+                });
+                document.getElementById('squad-cards').innerHTML = html;
+                const v1 = server6S[0] ? server6S[0].picks : [];
+                document.getElementById('live-vip').innerHTML = v1.map(n => `<div class="latest-ball" style="background:#be123c; color:white; border:none; width:36px; height:36px;">${pad2(n)}</div>`).join('') +
+                    `<button onclick='quickFill("6s", 1, ${JSON.stringify(v1)})' class="ml-4 bg-rose-600 text-white px-6 py-2.5 rounded-2xl text-[10px] font-black shadow-xl">裝載 V1</button>`;
+            }
+
+            function applyLiveDraw(d) {
+                if(recentHistory.length && recentHistory[0].no >= d.no) return;
+                recentHistory.unshift({ no: d.no, time: d.time, nums: d.nums }); if(recentHistory.length > 100) recentHistory.pop();
+                winNums = d.nums; server3S = d.squads['3s']; server4S = d.squads['4s']; server6S = d.squads['6s'];
+                document.getElementById('live-no').innerText = `${d.no} (${d.time})`;
+                document.getElementById('live-p-day').innerText = d.p_day; document.getElementById('live-p-20').innerText = d.p_20;
+                document.getElementById('live-s-day').innerText = d.s_day; document.getElementById('live-s-20').innerText = d.s_20;
+                document.getElementById('live-win').innerHTML = d.nums.map(n => `<div class="latest-ball ball-all" data-val="${n}">${pad2(n)}</div>`).join('');
+                renderSquadCards();
+                executeComparison();
+            }
+
+            function connectLive() {
+                // 歷史日期頁面不接推播
+                if(!window.EventSource || new URLSearchParams(location.search).get('date')) return;
+                const since = recentHistory.length ? `&last_no=${recentHistory[0].no}` : '';
+                const es = new EventSource(`/stream?exclusive=${liveExclusive}${since}`);
+                es.addEventListener('draw', (e) => applyLiveDraw(JSON.parse(e.data)));
+            }
+
+            function init() {
+                const isDark = localStorage.getItem('bingo_v121_dark') !== 'false';
+                if(isDark) { document.documentElement.classList.add('dark'); updateThemeUI(true); }
+                const s = localStorage.getItem('bingo_v121_matrix');
+                if(s) { const d = JSON.parse(s); 
+                    for(let i=1; i<=10; i++) { 
+                        if(d.s3[i]) d.s3[i].forEach((v, j) => { if(document.getElementById(`3s-g${i}n${j+1}`)) document.getElementById(`3s-g${i}n${j+1}`).value = v; }); 
+                        if(d.s4[i]) d.s4[i].forEach((v, j) => { if(document.getElementById(`4s-g${i}n${j+1}`)) document.getElementById(`4s-g${i}n${j+1}`).value = v; }); 
+                        if(d.s6[i]) d.s6[i].forEach((v, j) => { if(document.getElementById(`6s-g${i}n${j+1}`)) document.getElementById(`6s-g${i}n${j+1}`).value = v; }); 
+                    }
+                }
+                executeComparison();
+                connectLive();
+            }
+            window.onload = init;
+        </script>
+    </body>
+    </html>
+    """
+
+# 模板啟動時只編譯一次; bytecode 快取讓重啟後也不必重新編譯
+JINJA_CACHE_DIR = os.environ.get("BINGO_JINJA_CACHE", os.path.join(tempfile.gettempdir(), "bingo_jinja"))
+os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+jinja_env = jinja2.Environment(loader=jinja2.DictLoader({"index.html": INDEX_TEMPLATE}), bytecode_cache=jinja2.FileSystemBytecodeCache(JINJA_CACHE_DIR))
+index_template = jinja_env.get_template("index.html")
+TEMPLATE_VERSION = hashlib.sha1(INDEX_TEMPLATE.encode("utf-8")).hexdigest()[:8]
+
+# --- 2.1 頁面快取 (同一期號/日期/模式的輸出完全相同, 預先壓縮好各種編碼) ---
+
+PAGE_CACHE_SIZE = 64
+
+class PageCache:
+    def __init__(self, size=PAGE_CACHE_SIZE):
+        self.size = size
+        self.hits = 0; self.misses = 0
+        self._pages = collections.OrderedDict()
+
+    def get(self, key):
+        page = self._pages.get(key)
+        if page is None: self.misses += 1; return None
+        self.hits += 1; self._pages.move_to_end(key)
+        return page
+
+    def put(self, key, body, modified):
+        etag = 'W/"%s"' % hashlib.sha1(f"{key}-{TEMPLATE_VERSION}".encode()).hexdigest()[:16]
+        page = {"etag": etag, "last_modified": email.utils.formatdate(modified, usegmt=True), "modified": int(modified),
+                "identity": body, "gzip": gzip.compress(body, 6)}
+        if brotli is not None: page["br"] = brotli.compress(body, quality=5)
+        self._pages[key] = page
+        while len(self._pages) > self.size: self._pages.popitem(last=False)
+        return page
+
+    def add(self, key, page):
+        # 已經算好 ETag 與壓縮內容的頁面 (共享快照), 直接放入
+        self._pages[key] = page
+        while len(self._pages) > self.size: self._pages.popitem(last=False)
+
+    def clear(self):
+        self._pages.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._pages), "hit_rate": round(self.hits / total, 4) if total else 0.0}
+
+page_cache = PageCache()
+
+def render_page(result, exclusive):
+    (res_3star, res_4star, res_6star, p_day, s_day, p_20, s_20, status, latest_win, latest_no, latest_time, active_date, recent_history) = result
+    return index_template.render(res_3star=res_3star, res_4star=res_4star, res_6star=res_6star, p_day=p_day, s_day=s_day, p_20=p_20, s_20=s_20, status=status, latest_win=latest_win, latest_no=latest_no, latest_time=latest_time, active_date=active_date, exclusive=exclusive, recent_history=recent_history).encode("utf-8")
+
+def not_modified(request, page):
+    inm = request.headers.get("if-none-match")
+    if inm is not None: return page["etag"] in [t.strip() for t in inm.split(",")] or inm.strip() == "*"
+    ims = request.headers.get("if-modified-since")
+    if ims:
+        try: return email.utils.parsedate_to_datetime(ims).timestamp() >= page["modified"]
+        except (TypeError, ValueError): return False
+    return False
+
+def page_response(request, page):
+    headers = {"ETag": page["etag"], "Last-Modified": page["last_modified"], "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if not_modified(request, page): return Response(status_code=304, headers=headers)
+    accepted = request.headers.get("accept-encoding", "")
+    for enc in ("br", "gzip"):
+        if enc in page and enc in accepted:
+            headers["Content-Encoding"] = enc
+            return Response(page[enc], media_type="text/html; charset=utf-8", headers=headers)
+    return Response(page["identity"], media_type="text/html; charset=utf-8", headers=headers)
+
+@app.get("/", response_class=HTMLResponse)
+async def index(request: Request, date: str = None, exclusive: bool = True):
+    snap = poller.snapshot
+    if snap is not None and (not date or date == snap.date):
+        result, modified = snap.results[exclusive], snap.built_at
+    else:
+        result, modified = await get_data_and_analyze(date, exclusive), time.time()
+    key = (result[9], result[11], exclusive)
+    page = page_cache.get(key)
+    if page is None:
+        with metrics.span("render"): body = await asyncio.to_thread(render_page, result, exclusive)
+        page = page_cache.put(key, body, modified)
+    return page_response(request, page)
+
+# --- 3. 伺服器端回測 (開獎矩陣 x 組合矩陣, 一次矩陣乘法算出每期每組命中數) ---
+
+PRIZE_TABLE = {3: {2: 50, 3: 1000}, 4: {2: 25, 3: 150, 4: 2000}, 6: {3: 25, 4: 200, 5: 1200, 6: 50000}}
+MAX_BACKTEST_WINDOW = 20000
+
+class BacktestRequest(BaseModel):
+    squads: list[list[int]]
+    window: int = HISTORY_WINDOW
+    multiplier: int = 1
+    until_no: int | None = None
+    detail: bool = True
+
+def squads_matrix(squads):
+    return draws_matrix(squads) if squads else np.zeros((0, 80), dtype=bool)
+
+def prize_lut(sizes):
+    lut = np.zeros((len(sizes), 11), dtype=np.int64)
+    for k, size in enumerate(sizes):
+        for h, prize in PRIZE_TABLE.get(size, {}).items(): lut[k, h] = prize
+    return lut
+
+def run_backtest(m, squads, multiplier=1):
+    sizes = np.array([len(sq) for sq in squads], dtype=np.int64)
+    hits = (m.astype(np.float32) @ squads_matrix(squads).T.astype(np.float32)).astype(np.int64)  # N x K
+    prizes = prize_lut(sizes)[np.arange(len(squads)), hits] * multiplier
+    jackpot = hits == sizes
+    miss, first_jackpot = {}, {}
+    for size in PRIZE_TABLE:
+        # 同星數任一組全中的最新一期; 在那之前的期數就是目前未命中期數
+        cols = sizes == size
+        idx = np.flatnonzero(jackpot[:, cols].any(axis=1)) if cols.any() else np.zeros(0, dtype=np.int64)
+        first_jackpot[size] = int(idx[0]) if len(idx) else None
+        miss[size] = int(idx[0]) if len(idx) else len(m)
+    return hits, prizes, jackpot, miss, first_jackpot
+
+@app.post("/api/backtest")
+async def backtest(req: BacktestRequest):
+    for sq in req.squads:
+        if not 1 <= len(sq) <= 10 or len(set(sq)) != len(sq) or any(not 1 <= n <= 80 for n in sq):
+            raise HTTPException(status_code=422, detail=f"invalid squad: {sq}")
+    window = max(1, min(req.window, MAX_BACKTEST_WINDOW))
+    nos, times, m = await asyncio.to_thread(get_store().latest_matrix, window, req.until_no)
+    hits, prizes, jackpot, miss, first_jackpot = await asyncio.to_thread(run_backtest, m, req.squads, max(1, req.multiplier))
+    # 三星未命中起點: 最近一次三星全中的前一期, 從未全中則為視窗最舊一期
+    start_3s = first_jackpot[3]
+    if start_3s is None: start_no_3s = nos[-1] if nos else None
+    else: start_no_3s = nos[start_3s - 1] if start_3s > 0 else None
+    res = {"window": len(nos), "cost": len(req.squads) * 25 * max(1, req.multiplier) * len(nos),
+           "prize": int(prizes.sum()), "miss": {str(k): v for k, v in miss.items()}, "start_no_3s": start_no_3s,
+           "squads": [{"picks": sq, "jackpots": int(jackpot[:, k].sum()), "prize": int(prizes[:, k].sum()),
+                       "hist": np.bincount(hits[:, k], minlength=len(sq) + 1).tolist()} for k, sq in enumerate(req.squads)]}
+    if req.detail:
+        res["draws"] = [{"no": no, "time": t[11:16], "nums": (np.flatnonzero(row) + 1).tolist(), "hits": h, "prize": p}
+                        for no, t, row, h, p in zip(nos, times, m, hits.tolist(), prizes.sum(axis=1).tolist())]
+    return res
+
+@app.get("/stream")
+async def stream(request: Request, exclusive: bool = True, last_no: int | None = None):
+    resume = request.headers.get("last-event-id")
+    if resume and resume.isdigit(): last_no = int(resume)
+    q = broadcaster.subscribe()
+    async def events():
+        try:
+            yield b"retry: 5000\n\n"
+            # 頁面載入後才開出的新期, 連線時先補送一次
+            if broadcaster.last and last_no is not None and poller.snapshot and poller.snapshot.latest_no != last_no:
+                yield broadcaster.last[exclusive]
+            while True:
+                try: payloads = await asyncio.wait_for(q.get(), SSE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"; continue
+                yield payloads[exclusive]
+        finally:
+            broadcaster.unsubscribe(q)
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+MAX_SQUADS = 500
+
+@app.get("/api/squads")
+async def squads(size: int = 6, count: int = 10, exclusive: bool = False):
+    if not 3 <= size <= 10 or not 1 <= count <= MAX_SQUADS:
+        raise HTTPException(status_code=422, detail=f"size must be 3-10 and count 1-{MAX_SQUADS}")
+    snap = poller.snapshot
+    if snap is None: raise HTTPException(status_code=503, detail="snapshot not ready")
+    return {"no": snap.latest_no, "size": size, "exclusive": exclusive, "squads": snap.generator.generate(size, count, exclusive)}
+
+# --- 3.1 JSON API v1 (資料與頁面分離; ETag 以期號為準, 沒有新開獎就回 304) ---
+
+API_MAX_PAGE = 1000
+
+class CompactJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content):
+        if orjson is not None: return orjson.dumps(content)
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def api_response(request, content, tag, immutable=False):
+    headers = {"ETag": f'W/"{tag}"', "Cache-Control": "public, max-age=86400, immutable" if immutable else "no-cache"}
+    if request.headers.get("if-none-match") == headers["ETag"]: return Response(status_code=304, headers=headers)
+    return CompactJSONResponse(content, headers=headers)
+
+def live_snapshot():
+    snap = poller.snapshot
+    if snap is None: raise HTTPException(status_code=503, detail="snapshot not ready")
+    return snap
+
+def mask_hex(blob):
+    return f"{int.from_bytes(blob, 'little'):020x}"
+
+@app.get("/api/v1/latest")
+async def api_latest(request: Request):
+    snap = live_snapshot(); r = snap.results[True]
+    return api_response(request, {"no": r[9], "time": r[10], "date": r[11], "nums": r[8]}, f"latest-{snap.latest_no}")
+
+@app.get("/api/v1/history")
+async def api_history(request: Request, offset: int = 0, limit: int = HISTORY_WINDOW, until_no: int | None = None, packed: bool = False):
+    limit = max(1, min(limit, API_MAX_PAGE)); offset = max(0, offset)
+    rows = await asyncio.to_thread(get_store().page, offset, limit, until_no)
+    if packed: draws = [[no, t[11:16], mask_hex(blob)] for no, t, blob in rows]  # 號碼壓成 80 bit 遮罩 (20 位 hex, bit i = 號碼 i+1)
+    else: draws = [{"no": no, "time": t[11:16], "nums": decode_nums(blob)} for no, t, blob in rows]
+    head = rows[0][0] if rows else 0
+    nxt = offset + limit if len(rows) == limit else None
+    # 指定已開出的 until_no 時內容不會再變, 可以長期快取
+    snap = poller.snapshot
+    frozen = until_no is not None and snap is not None and isinstance(snap.latest_no, int) and until_no <= snap.latest_no
+    return api_response(request, {"offset": offset, "limit": limit, "next_offset": nxt, "packed": packed, "draws": draws},
+                        f"history-{head}-{offset}-{limit}-{int(packed)}", immutable=frozen)
+
+@app.get("/api/v1/ratios")
+async def api_ratios(request: Request):
+    snap = live_snapshot(); r = snap.results[True]
+    return api_response(request, {"no": snap.latest_no, "p_day": r[3], "s_day": r[4], "p_20": r[5], "s_20": r[6], "status": r[7]}, f"ratios-{snap.latest_no}")
+
+@app.get("/api/v1/scores")
+async def api_scores(request: Request):
+    snap = live_snapshot()
+    return api_response(request, {"no": snap.latest_no, "scores": [a['score'] for a in snap.scores]}, f"scores-{snap.latest_no}")
+
+@app.get("/api/v1/squads")
+async def api_squads(request: Request, exclusive: bool = True):
+    snap = live_snapshot(); r = snap.results[exclusive]
+    return api_response(request, {"no": snap.latest_no, "exclusive": exclusive, "3s": r[0], "4s": r[1], "6s": r[2]}, f"squads-{snap.latest_no}-{int(exclusive)}")
+
+@app.get("/api/v1/range")
+async def api_range(request: Request, start: str, end: str, exclusive: bool = True):
+    snapshots = await get_range_analysis(start, end)
+    days = []
+    for d, snap in snapshots.items():
+        r = snap.results[exclusive]
+        days.append({"date": d, "no": r[9], "time": r[10], "nums": r[8], "p_day": r[3], "s_day": r[4], "p_20": r[5], "s_20": r[6],
+                     "status": r[7], "3s": r[0], "4s": r[1], "6s": r[2]})
+    tag = f"range-{start}-{end}-{int(exclusive)}-{days[-1]['no'] if days else 0}"
+    return api_response(request, {"start": start, "end": end, "exclusive": exclusive, "days": days}, tag, immutable=end < datetime.date.today().isoformat())
+
+@metrics.collector
+def runtime_metrics():
+    snap = poller.snapshot
+    out = [("bingo_http_active_requests", "gauge", (), metrics.active_requests),
+           ("bingo_stream_clients", "gauge", (), len(broadcaster.clients)),
+           ("bingo_snapshot_age_seconds", "gauge", (), round(time.time() - snap.built_at, 3) if snap else -1)]
+    for cache, stats in (("draws", draw_cache.stats()), ("pages", page_cache.stats())):
+        out.append(("bingo_cache_hits_total", "counter", (("cache", cache),), stats["hits"] + stats.get("coalesced", 0) + stats.get("stale", 0)))
+        out.append(("bingo_cache_misses_total", "counter", (("cache", cache),), stats["misses"]))
+        out.append(("bingo_cache_hit_ratio", "gauge", (("cache", cache),), stats["hit_rate"]))
+    if shared is not None:
+        out.append(("bingo_shared_leader", "gauge", (), int(shared.leader)))
+        out.append(("bingo_shared_loads_total", "counter", (), shared.loads))
+    # 斷路器狀態: 0 正常, 1 斷路, 2 等待探測
+    for source in upstream_sources:
+        out.append(("bingo_upstream_breaker_state", "gauge", (("source", source.name),), ("closed", "open", "half_open").index(source.breaker.state)))
+    return out
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return {**draw_cache.stats(), "pages": page_cache.stats(), "stream_clients": len(broadcaster.clients),
+            "upstream": {source.name: source.breaker.state for source in upstream_sources}}
+
+# --- 4. 蒙地卡羅顯著性檢定 (逐期前推重播評分模型, 與大量隨機選號基準比較) ---
+
+SIM_SIZES = (3, 4, 6)
+SIM_SQUADS = 10
+SIM_SHARD_DRAWS = 500
+SIM_SHARD_BASELINES = 250
+SIM_CHUNK_DRAWS = 1000
+BET_COST = 25
+
+def sim_sizes():
+    return np.repeat(SIM_SIZES, SIM_SQUADS)
+
+def _replay_shard(m, warmup, exclusive):
+    # m 由舊到新: 前 warmup 期只用來暖機視窗, 之後每期只用「之前」的資料選號, 再對當期開獎
+    state = DrawState()
+    for row in m[:warmup]: state.push(row)
+    sizes = sim_sizes(); lut = prize_lut(sizes); cols = np.arange(len(sizes))
+    prizes = np.zeros((len(m) - warmup, len(sizes)), dtype=np.int64)
+    for t in range(warmup, len(m)):
+        all_analysis, _ = state.analysis()
+        generator = SquadGenerator(all_analysis, state.co_occ)
+        picks = [sq['picks'] for size in SIM_SIZES for sq in generator.generate(size, SIM_SQUADS, exclusive)]
+        hits = squads_matrix(picks).astype(np.int64) @ m[t].astype(np.int64)
+        prizes[t - warmup] = lut[cols, hits]
+        state.push(m[t])
+    return prizes
+
+def _baseline_shard(seed_seq, n_baselines, n_draws):
+    # 隨機組合與開獎獨立, 命中數恰為超幾何分佈 (80 顆取 20, 中 size 顆), 直接抽樣等同逐期隨機選號
+    rng = np.random.default_rng(seed_seq)
+    sizes = sim_sizes(); lut = prize_lut(sizes); cols = np.arange(len(sizes))
+    totals = np.zeros((n_baselines, len(sizes)), dtype=np.int64); wins = np.zeros_like(totals)
+    for start in range(0, n_draws, SIM_CHUNK_DRAWS):
+        hits = rng.hypergeometric(20, 60, sizes, size=(n_baselines, min(SIM_CHUNK_DRAWS, n_draws - start), len(sizes)))
+        prizes = lut[cols, hits]
+        totals += prizes.sum(axis=1); wins += (prizes > 0).sum(axis=1)
+    return totals, wins
+
+def _ci(values, level=0.95):
+    lo, hi = np.percentile(values, [(1 - level) / 2 * 100, (1 + level) / 2 * 100])
+    return [round(float(lo), 4), round(float(hi), 4)]
+
+def run_simulation(store, start, end, baselines=2000, workers=None, seed=0, exclusive=False, bootstrap=1000):
+    n_eval = store.count_between(start, end)
+    if not n_eval: raise ValueError(f"no archived draws between {start} and {end}, run backfill first")
+    nos, _, m = store.latest_matrix(n_eval + ANALYSIS_DEPTH, until_date=end)
+    m = m[::-1]; first = len(m) - n_eval
+    # 分片數量只由資料量決定, 與 worker 數無關, 結果才能重現
+    model_shards = [(a, min(a + SIM_SHARD_DRAWS, len(m))) for a in range(first, len(m), SIM_SHARD_DRAWS)]
+    base_counts = [min(SIM_SHARD_BASELINES, baselines - i) for i in range(0, baselines, SIM_SHARD_BASELINES)]
+    base_seeds = np.random.SeedSequence(seed).spawn(len(base_counts))
+    with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        model_futs = [pool.submit(_replay_shard, m[a - min(ANALYSIS_DEPTH, a):b], min(ANALYSIS_DEPTH, a), exclusive) for a, b in model_shards]
+        base_futs = [pool.submit(_baseline_shard, ss, n, n_eval) for ss, n in zip(base_seeds, base_counts)]
+        prizes = np.concatenate([f.result() for f in model_futs])
+        base = [f.result() for f in base_futs]
+    base_totals = np.concatenate([b[0] for b in base]); base_wins = np.concatenate([b[1] for b in base])
+
+    sizes = sim_sizes()
+    cost_per_draw = len(sizes) * BET_COST
+    model_roi = prizes.sum() / (n_eval * cost_per_draw) - 1
+    # 模型 ROI 的信賴區間: 以期為單位 bootstrap
+    rng = np.random.default_rng(seed)
+    per_draw = prizes.sum(axis=1)
+    boot = per_draw[rng.integers(0, n_eval, size=(bootstrap, n_eval))].sum(axis=1) / (n_eval * cost_per_draw) - 1
+    base_roi = base_totals.sum(axis=1) / (n_eval * cost_per_draw) - 1
+    report = {"start": start, "end": end, "draws": n_eval, "first_no": int(nos[n_eval - 1]), "last_no": int(nos[0]),
+              "baselines": baselines, "seed": seed, "exclusive": exclusive,
+              "model": {"roi": round(float(model_roi), 4), "roi_ci95": _ci(boot), "hit_rate": round(float((prizes > 0).mean()), 4)},
+              "baseline": {"roi_mean": round(float(base_roi.mean()), 4), "roi_ci95": _ci(base_roi),
+                           "hit_rate_mean": round(float(base_wins.sum(axis=1).mean() / (n_eval * len(sizes))), 4)},
+              # 單尾經驗 p 值: 隨機基準 ROI 不低於模型的比例
+              "p_value": round(float(((base_roi >= model_roi).sum() + 1) / (baselines + 1)), 4),
+              "by_size": {}}
+    for size in SIM_SIZES:
+        cols = sizes == size; cost = n_eval * cols.sum() * BET_COST
+        b_roi = base_totals[:, cols].sum(axis=1) / cost - 1
+        report["by_size"][str(size)] = {"model_roi": round(float(prizes[:, cols].sum() / cost - 1), 4),
+                                        "model_hit_rate": round(float((prizes[:, cols] > 0).mean()), 4),
+                                        "baseline_roi_ci95": _ci(b_roi),
+                                        "baseline_hit_rate_mean": round(float(base_wins[:, cols].sum(axis=1).mean() / (n_eval * cols.sum())), 4)}
+    return report
+
+# --- 5. 評分參數掃描 (前推驗證; 視窗統計用前綴和一次算好, 同開矩陣逐期增量更新; 可中斷續跑) ---
+
+SWEEP_SPACE = {
+    "co_occ_window": [100, 200, 400],
+    "long_window": [30, 50, 80],
+    "short_window": [10, 15, 20],
+    "ratio_window": [10, 20, 30],
+    "streak1_bonus": [0.0, 2.5, 5.0],
+    "streak2_bonus": [0.0, 2.0, 4.0],
+    "streak_penalty": [-25.0, -15.0, -5.0, 0.0],
+    "ratio_weight": [1.0, 1.2, 1.5],
+    "heat_weight": [0.0, 1.0, 2.0, 3.0],
+    "ratio_threshold": [0.35, 0.4, 0.45],
+}
+SWEEP_BATCH = 8
+SWEEP_CHECKPOINT = "sweep_checkpoint.jsonl"
+
+def params_key(params):
+    return json.dumps(dataclasses.asdict(params), sort_keys=True)
+
+def sweep_candidates(mode="random", samples=40, seed=0):
+    keys = list(SWEEP_SPACE)
+    if mode == "grid":
+        configs = [ScoringParams(**dict(zip(keys, combo))) for combo in itertools.product(*SWEEP_SPACE.values())]
+    else:
+        rng = random.Random(seed)
+        configs = [ScoringParams()] + [ScoringParams(**{k: rng.choice(v) for k, v in SWEEP_SPACE.items()}) for _ in range(samples - 1)]
+    seen = set()
+    return [c for c in configs if not (params_key(c) in seen or seen.add(params_key(c)))]
+
+class SweepData:
+    # 所有參數組合共用: 累積次數前綴和 (任一視窗 = 兩列相減) 與逐期連開數
+    def __init__(self, m, first):
+        self.m = m; self.first = first
+        self.prefix = np.zeros((len(m) + 1, 80), dtype=np.int32)
+        np.cumsum(m, axis=0, dtype=np.int32, out=self.prefix[1:])
+        self.odd = self.prefix[:, ODD_COLS].sum(axis=1); self.small = self.prefix[:, SMALL_COLS].sum(axis=1)
+        self.streaks = np.zeros((len(m) + 1, 80), dtype=np.int64)
+        for t, row in enumerate(m): self.streaks[t + 1] = np.where(row, self.streaks[t] + 1, 0)
+
+    def window(self, arr, t, w):
+        return arr[t] - arr[max(0, t - w)]
+
+def _sweep_batch(data, configs, fold_of, n_folds, exclusive):
+    sizes = sim_sizes(); lut = prize_lut(sizes); cols = np.arange(len(sizes))
+    co = {w: co_occurrence(data.m[max(0, data.first - w):data.first]) for w in {c.co_occ_window for c in configs}}
+    totals = np.zeros((len(configs), n_folds), dtype=np.int64)
+    for t in range(data.first, len(data.m)):
+        fold = fold_of[t - data.first]; row = data.m[t].astype(np.int64)
+        for i, c in enumerate(configs):
+            _, _, status = ratio_status(int(data.window(data.odd, t, c.ratio_window)), int(data.window(data.small, t, c.ratio_window)), c)
+            all_analysis = score_numbers(data.window(data.prefix, t, c.long_window), data.window(data.prefix, t, c.short_window), data.streaks[t], status, c)
+            generator = SquadGenerator(all_analysis, co[c.co_occ_window])
+            picks = [sq['picks'] for size in SIM_SIZES for sq in generator.generate(size, SIM_SQUADS, exclusive)]
+            totals[i, fold] += lut[cols, squads_matrix(picks).astype(np.int64) @ row].sum()
+        v = data.m[t].astype(np.int32)
+        for w, mat in co.items():
+            mat += np.outer(v, v)
+            if t - w >= 0:
+                old = data.m[t - w].astype(np.int32); mat -= np.outer(old, old)
+    return [params_key(c) for c in configs], totals.tolist()
+
+def run_sweep(store, start, end, mode="random", samples=40, folds=4, seed=0, workers=None, exclusive=False, checkpoint=SWEEP_CHECKPOINT):
+    configs = sweep_candidates(mode, samples, seed)
+    n_eval = store.count_between(start, end)
+    if n_eval < folds: raise ValueError(f"not enough archived draws between {start} and {end}, run backfill first")
+    depth = max(c.depth for c in configs)
+    nos, _, m = store.latest_matrix(n_eval + depth, until_date=end)
+    m = m[::-1]; first = len(m) - n_eval
+    run_id = {"start": start, "end": end, "first_no": int(nos[n_eval - 1]), "last_no": int(nos[0]), "folds": folds, "exclusive": exclusive}
+    fold_of = np.concatenate([np.full(len(chunk), k) for k, chunk in enumerate(np.array_split(np.arange(n_eval), folds))])
+    fold_draws = np.bincount(fold_of, minlength=folds)
+
+    # 續跑: 讀回同一段資料 / 同樣切分的已完成結果, 只算剩下的組合
+    done = {}
+    if checkpoint and os.path.exists(checkpoint):
+        with open(checkpoint, encoding="utf-8") as f:
+            for line in f:
+                rec = json.loads(line)
+                if rec.get("run") == run_id: done[rec["key"]] = rec["folds"]
+    todo = [c for c in configs if params_key(c) not in done]
+    print(f"[sweep] {len(configs)} configs, {len(done)} from checkpoint, {n_eval} draws x {folds} folds")
+    if todo:
+        data = SweepData(m, first)
+        batches = [todo[i:i + SWEEP_BATCH] for i in range(0, len(todo), SWEEP_BATCH)]
+        with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+            futs = [pool.submit(_sweep_batch, data, batch, fold_of, folds, exclusive) for batch in batches]
+            for fut in concurrent.futures.as_completed(futs):
+                keys, totals = fut.result()
+                with open(checkpoint, "a", encoding="utf-8") if checkpoint else contextlib.nullcontext() as f:
+                    for key, tot in zip(keys, totals):
+                        done[key] = tot
+                        if f: f.write(json.dumps({"run": run_id, "key": key, "folds": tot}) + "\n")
+                print(f"[sweep] {len(done)}/{len(configs)}")
+
+    keys = [params_key(c) for c in configs]
+    totals = np.array([done[k] for k in keys], dtype=np.float64)
+    cost = fold_draws * len(sim_sizes()) * BET_COST
+    roi = totals.sum(axis=1) / cost.sum() - 1
+    # 前推驗證: 第 k 段用前 k 段表現最好的參數, 只計算它在第 k 段 (樣本外) 的報酬
+    oos_prize, picks = 0.0, []
+    for k in range(1, folds):
+        best = int(np.argmax(totals[:, :k].sum(axis=1)))
+        picks.append(best); oos_prize += totals[best, k]
+    wf_roi = oos_prize / cost[1:].sum() - 1 if folds > 1 else None
+    order = np.argsort(-roi, kind="stable")
+    winner = configs[order[0]]
+    return {"run": run_id, "configs": len(configs), "winner": dataclasses.asdict(winner), "winner_roi": round(float(roi[order[0]]), 4),
+            "default_roi": round(float(roi[keys.index(params_key(ScoringParams()))]), 4) if params_key(ScoringParams()) in keys else None,
+            "walk_forward_roi": round(float(wf_roi), 4) if wf_roi is not None else None,
+            "walk_forward_picks": [dataclasses.asdict(configs[i]) for i in picks],
+            "top": [{"roi": round(float(roi[i]), 4), "params": dataclasses.asdict(configs[i])} for i in order[:10]]}
+
+def save_params(report, path=PARAMS_PATH):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"params": report["winner"], "roi": report["winner_roi"], "walk_forward_roi": report["walk_forward_roi"], "run": report["run"]}, f, ensure_ascii=False, indent=2)
+
+# --- 6. 效能基準 (固定種子的合成開獎 + 離線上游替身; 各歷史長度計時並與存檔基準比較) ---
+
+BENCH_SIZES = (100, 1000, 10000, 100000)
+BENCH_REPEAT = 5
+BENCH_END = "2026-01-31"
+BENCH_FIRST_NO = 115000001
+BENCH_BASELINE = "bench_baseline.json"
+BENCH_TOLERANCE = 1.25  # 最快一次比基準慢超過 25% (且至少慢 5ms) 視為退步; 取最快一次比較不受偶發干擾影響
+
+def synth_draws(n, seed=0, end=BENCH_END):
+    # 每天 07:05 起每 5 分鐘一期, 最後一期落在 end 當天 (當天可能未開完); 回傳 {日期: [上游格式資料 (新到舊)]}
+    rng = np.random.default_rng(seed)
+    picks = np.sort(rng.random((n, 80)).argsort(axis=1)[:, :20] + 1, axis=1)
+    first_day = datetime.datetime.fromisoformat(end) - datetime.timedelta(days=(n - 1) // DAY_DRAWS)
+    days = {}
+    for i, nums in enumerate(picks.tolist()):
+        t = first_day + datetime.timedelta(days=i // DAY_DRAWS, hours=7, minutes=5 + 5 * (i % DAY_DRAWS))
+        days.setdefault(t.date().isoformat(), []).append({"No": BENCH_FIRST_NO + i, "OpenDate": t.isoformat(), "BigShowOrder": ",".join(f"{x:02d}" for x in nums)})
+    for items in days.values(): items.reverse()
+    return days
+
+def bench_digest(obj):
+    return hashlib.sha1(json.dumps(obj, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:12]
+
+async def _bench_case(fn, repeat):
+    times, out = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter(); out = await fn(); times.append(time.perf_counter() - t0)
+    return times, out
+
+async def bench_size(n, repeat=BENCH_REPEAT, seed=0):
+    global fetch_api, draw_cache, page_cache, _store
+    days = synth_draws(n, seed)
+    async def offline_fetch(date_str):
+        return days.get(date_str, [])
+    saved = fetch_api, draw_cache, page_cache, _store
+    tmp = tempfile.mkdtemp(prefix="bingo_bench_")
+    cases = {}
+    try:
+        # 暫存資料庫先放入目標日以前的資料, 目標日 (與不滿一天的最舊日) 第一次分析時經由離線替身補抓
+        fetch_api, draw_cache, page_cache = offline_fetch, DrawCache(), PageCache()
+        store = _store = DrawStore(os.path.join(tmp, "bench.sqlite3"))
+        t0 = time.perf_counter()
+        store.add_items([item for d, items in days.items() if d != BENCH_END for item in items])
+        cases["load"] = ([time.perf_counter() - t0], store.count())
+
+        async def analyze(): return await get_data_and_analyze(BENCH_END, True)
+        cases["analyze"] = await _bench_case(analyze, repeat)
+        result = cases["analyze"][1]
+
+        nos, _, m = store.latest_matrix(n)
+        ws = window_stats(m[:ANALYSIS_DEPTH]); _, _, status = ratio_status(ws["o_20"], ws["s_20"])
+        pool = score_numbers(ws["long_freq"], ws["short_heat"], ws["streaks"], status)
+        async def squads(): return build_squads(pool, ws["co_occ"], True)
+        cases["squads"] = await _bench_case(squads, repeat)
+
+        picks = [sq["picks"] for group in result[:3] for sq in group]
+        async def backtest():
+            _, prizes, _, miss, _ = run_backtest(m, picks)
+            return prizes.sum(axis=0).tolist(), miss
+        cases["backtest"] = await _bench_case(backtest, repeat)
+
+        async def replay():
+            state = DrawState()
+            for item in reversed(store.latest(n)): state.apply(item)
+            return state.snapshot(BENCH_END).results[True]
+        cases["replay"] = await _bench_case(replay, max(1, repeat // 2) if n >= 10000 else repeat)
+
+        # 完整走一遍 index 路由 (含 middleware 與壓縮); cold 每次清空頁面快取, warm 直接命中
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            async def index_cold():
+                page_cache.clear()
+                return (await client.get("/", params={"date": BENCH_END})).content
+            async def index_warm(): return (await client.get("/", params={"date": BENCH_END})).content
+            cases["index_cold"] = await _bench_case(index_cold, repeat)
+            cases["index_warm"] = await _bench_case(index_warm, repeat)
+    finally:
+        fetch_api, draw_cache, page_cache, _store = saved
+        shutil.rmtree(tmp, ignore_errors=True)
+    return {name: {"median_s": round(statistics.median(times), 6), "min_s": round(min(times), 6), "runs": len(times), "digest": bench_digest(out)}
+            for name, (times, out) in cases.items()}
+
+def run_bench(sizes=BENCH_SIZES, repeat=BENCH_REPEAT, seed=0, baseline=BENCH_BASELINE):
+    report = {"meta": {"seed": seed, "end": BENCH_END, "params": params_key(PARAMS), "python": sys.version.split()[0], "numpy": np.__version__},
+              "cases": {}, "regressions": [], "mismatches": []}
+    for n in sizes:
+        for name, res in asyncio.run(bench_size(n, repeat, seed)).items():
+            report["cases"][f"{n}/{name}"] = res
+            print(f"[bench] {n:>7} {name:<11} median {res['median_s'] * 1000:9.2f} ms  min {res['min_s'] * 1000:9.2f} ms  {res['digest']}")
+    base = None
+    if baseline and os.path.exists(baseline):
+        with open(baseline, encoding="utf-8") as f: base = json.load(f)
+    if base:
+        # 參數或種子不同時輸出本來就會不同, 只比較時間
+        same_inputs = all(base["meta"].get(k) == report["meta"][k] for k in ("seed", "end", "params"))
+        for key, res in report["cases"].items():
+            old = base["cases"].get(key)
+            if not old: continue
+            if res["min_s"] > old["min_s"] * BENCH_TOLERANCE and res["min_s"] - old["min_s"] > 0.005:
+                report["regressions"].append({"case": key, "baseline_s": old["min_s"], "min_s": res["min_s"], "ratio": round(res["min_s"] / old["min_s"], 2)})
+            if same_inputs and old["digest"] != res["digest"]:
+                report["mismatches"].append({"case": key, "baseline": old["digest"], "digest": res["digest"]})
+    return report
+
+def save_bench_baseline(report, path=BENCH_BASELINE):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"meta": report["meta"], "cases": report["cases"]}, f, ensure_ascii=False, indent=2)
+
+# --- 7. 本地上游替身 (模擬 winwin.tw 的 GetBingoData, 可注入錯誤與延遲; 用來測試容錯與斷路) ---
+
+STUB_PORT = 8001
+
+def make_stub_app(days, fail_rate=0.0, delay=0.0, seed=None):
+    stub = FastAPI()
+    rng = random.Random(seed)
+    stub.state.requests = 0
+
+    @stub.get("/Bingo/GetBingoData")
+    async def get_bingo_data(date: str = ""):
+        stub.state.requests += 1
+        if delay: await asyncio.sleep(delay)
+        if fail_rate and rng.random() < fail_rate: return Response(status_code=503)
+        return days.get(date[:10], [])
+
+    return stub
+
+def load_stub_days(fixture=None, draws=DAY_DRAWS * 30, seed=0):
+    if not fixture: return synth_draws(draws, seed, datetime.date.today().isoformat())
+    with open(fixture, encoding="utf-8") as f: data = json.load(f)
+    if isinstance(data, dict): return data
+    days = {}
+    for item in data: days.setdefault(str(item.get('OpenDate', ''))[:10], []).append(item)
+    return days
+
+if __name__ == "__main__":
+    # python 爬蟲.py                                   啟動網頁服務
+    # python 爬蟲.py serve --workers 4                 多 worker: 一個領導者輪詢分析, 其他 worker 讀共享快照
+    # python 爬蟲.py backfill 2026-01-01 2026-03-31    回補歷史開獎到本地資料庫
+    # python 爬蟲.py simulate 2026-01-01 2026-03-31    評分模型 vs 隨機選號的顯著性檢定
+    # python 爬蟲.py sweep 2026-01-01 2026-03-31 --save  掃描評分參數, 最佳組合存檔供網頁服務載入
+    # python 爬蟲.py bench --save                      離線效能基準, 與存檔基準比較 (退步時結束碼為 1)
+    # python 爬蟲.py stub --fail-rate 0.3              本地上游替身; 以 BINGO_SOURCES=http://127.0.0.1:8001/Bingo/GetBingoData 指向它
+    parser = argparse.ArgumentParser(prog="爬蟲.py")
+    sub = parser.add_subparsers(dest="cmd")
+    p_serve = sub.add_parser("serve"); p_serve.add_argument("--host", default="0.0.0.0"); p_serve.add_argument("--port", type=int, default=8000)
+    p_serve.add_argument("--workers", type=int, default=1)
+    p_back = sub.add_parser("backfill"); p_back.add_argument("start"); p_back.add_argument("end", nargs="?")
+    p_sim = sub.add_parser("simulate"); p_sim.add_argument("start"); p_sim.add_argument("end", nargs="?")
+    p_sim.add_argument("--baselines", type=int, default=2000); p_sim.add_argument("--workers", type=int, default=None)
+    p_sim.add_argument("--seed", type=int, default=0); p_sim.add_argument("--exclusive", action="store_true")
+    p_sim.add_argument("--out", help="把報告另存成 JSON 檔")
+    p_sweep = sub.add_parser("sweep"); p_sweep.add_argument("start"); p_sweep.add_argument("end", nargs="?")
+    p_sweep.add_argument("--mode", choices=["random", "grid"], default="random"); p_sweep.add_argument("--samples", type=int, default=40)
+    p_sweep.add_argument("--folds", type=int, default=4); p_sweep.add_argument("--seed", type=int, default=0)
+    p_sweep.add_argument("--workers", type=int, default=None); p_sweep.add_argument("--exclusive", action="store_true")
+    p_sweep.add_argument("--checkpoint", default=SWEEP_CHECKPOINT)
+    p_sweep.add_argument("--save", action="store_true", help=f"把最佳參數寫入 {PARAMS_PATH}, 網頁服務重啟後套用")
+    p_bench = sub.add_parser("bench"); p_bench.add_argument("--sizes", type=lambda v: [int(x) for x in v.split(",")], default=list(BENCH_SIZES))
+    p_bench.add_argument("--repeat", type=int, default=BENCH_REPEAT); p_bench.add_argument("--seed", type=int, default=0)
+    p_bench.add_argument("--baseline", default=BENCH_BASELINE); p_bench.add_argument("--out", help="把報告另存成 JSON 檔")
+    p_bench.add_argument("--save", action="store_true", help="把這次結果存成新的基準")
+    p_stub = sub.add_parser("stub"); p_stub.add_argument("--port", type=int, default=STUB_PORT)
+    p_stub.add_argument("--fixture", help="上游格式的 JSON 檔; 不給則產生合成開獎 (最後一期在今天)")
+    p_stub.add_argument("--draws", type=int, default=DAY_DRAWS * 30); p_stub.add_argument("--seed", type=int, default=0)
+    p_stub.add_argument("--fail-rate", type=float, default=0.0, help="回 503 的機率"); p_stub.add_argument("--delay", type=float, default=0.0, help="每個請求延遲秒數")
+    args = parser.parse_args()
+    if args.cmd == "backfill":
+        async def run_backfill():
+            try: return await backfill(args.start, args.end or args.start)
+            finally: await get_http_client().aclose()
+        print(f"[backfill] done, +{asyncio.run(run_backfill())} draws -> {DB_PATH}")
+    elif args.cmd == "simulate":
+        t0 = time.perf_counter()
+        report = run_simulation(get_store(), args.start, args.end or datetime.date.today().isoformat(), args.baselines, args.workers, args.seed, args.exclusive)
+        report["elapsed_s"] = round(time.perf_counter() - t0, 2)
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f: json.dump(report, f, ensure_ascii=False, indent=2)
+    elif args.cmd == "sweep":
+        report = run_sweep(get_store(), args.start, args.end or datetime.date.today().isoformat(), args.mode, args.samples, args.folds,
+                           args.seed, args.workers, args.exclusive, args.checkpoint)
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        if args.save: save_params(report); print(f"[sweep] saved -> {PARAMS_PATH}")
+    elif args.cmd == "bench":
+        report = run_bench(args.sizes, args.repeat, args.seed, args.baseline)
+        for r in report["regressions"]: print(f"[bench] REGRESSION {r['case']}: {r['baseline_s'] * 1000:.2f} -> {r['min_s'] * 1000:.2f} ms (x{r['ratio']})")
+        for r in report["mismatches"]: print(f"[bench] OUTPUT CHANGED {r['case']}: {r['baseline']} -> {r['digest']}")
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f: json.dump(report, f, ensure_ascii=False, indent=2)
+        if args.save: save_bench_baseline(report, args.baseline); print(f"[bench] baseline saved -> {args.baseline}")
+        elif report["regressions"] or report["mismatches"]: sys.exit(1)
+    elif args.cmd == "serve" and args.workers > 1:
+        # worker 由 uvicorn 另開行程重新載入本檔, 共享快照路徑經環境變數傳下去
+        shm = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+        os.environ.setdefault("BINGO_SHARED", os.path.join(shm, f"bingo_snapshot_{args.port}.bin"))
+        uvicorn.run(f"{os.path.splitext(os.path.basename(__file__))[0]}:app", host=args.host, port=args.port, workers=args.workers,
+                    app_dir=os.path.dirname(os.path.abspath(__file__)))
+    elif args.cmd == "serve":
+        uvicorn.run(app, host=args.host, port=args.port)
+    elif args.cmd == "stub":
+        uvicorn.run(make_stub_app(load_stub_days(args.fixture, args.draws, args.seed), args.fail_rate, args.delay, args.seed), host="127.0.0.1", port=args.port)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8000)